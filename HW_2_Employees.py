@@ -1,3 +1,56 @@
+import glob
+import locale
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from operator import itemgetter
+from typing import Iterable, Iterator
+
+from parallel_counting import effective_n_jobs
+from quantile_sketch import KllSketch
+from report_writer import write_report
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CORP_SUMMARY_PATH = 'Corp_Summary.csv'
+CHUNK_SIZE = 64 * 1024 * 1024
+EMPLOYEE_COLUMNS = {'name': 0, 'department': 1, 'team': 2, 'position': 3, 'rating': 4, 'salary': 5}
+
+_statistics_cache = {}
+
+
+def iter_employees(path: str) -> Iterator[list]:
+    """
+    Функция построчно читает файл с работниками и возвращает их по одному,
+    поэтому весь файл в памяти не хранится. Каждый работник имеет вид:
+    ФИО, департамент, команда, должность, оценка, зарплата
+    :param path: строка, содержащая путь к файлу
+    :return: генератор работников
+    """
+    with open(path, 'r') as file:
+        next(file, None)
+        for line in file:
+            yield parse_employee(line)
+
+
+def parse_employee(line: str) -> list:
+    """
+    Функция разбирает строку файла с работниками
+    :param line: строка файла (поля разделены ';')
+    :return: работник (ФИО, департамент, команда, должность,
+             оценка, зарплата)
+    """
+    employee = line.split(';')
+    employee[4] = float(employee[4])
+    employee[5] = int(employee[5])
+    return employee
+
+
 def get_employees(path: str) -> list:
     """
     Функция создает список работников. Данные берутся из файла.
@@ -6,59 +59,595 @@ def get_employees(path: str) -> list:
     :param path: строка, содержащая путь к файлу
     :return: возвращается список работников
     """
-    file = open(path, 'r')
-    employees = []
-    for line in file:
-        employees.append(line.split(';'))
-    file.close()
-    employees = employees[1:]
-    for employee in employees:
-        employee[4] = float(employee[4])
-        employee[5] = int(employee[5])
-    return employees
+    return list(iter_employees(path))
+
+
+class CorpStatistics:
+    """
+    Класс собирает статистику по департаментам за один проход по
+    работникам: численность, минимальную, максимальную и суммарную
+    зарплату, а также команды каждого департамента. Память
+    пропорциональна числу департаментов и команд, а не работников
+    """
+
+    def __init__(self, employees: Iterable[list] = ()):
+        """
+        Инициализатор класса CorpStatistics
+        departments - словарь {департамент: [численность, мин. зарплата,
+                      макс. зарплата, суммарная зарплата]}
+        hierarchy - словарь {департамент: множество команд}
+        :param employees: работники, которые сразу учитываются
+        """
+        self.departments = {}
+        self.hierarchy = {}
+        self.update(employees)
+
+    def add(self, employee: list):
+        """
+        Функция учитывает одного работника
+        :param employee: работник (ФИО, департамент, команда, должность,
+                         оценка, зарплата)
+        :return: функция ничего не возвращает
+        """
+        department, salary = employee[1], employee[5]
+        state = self.departments.get(department)
+        if state is None:
+            self.departments[department] = [1, salary, salary, salary]
+            self.hierarchy[department] = {employee[2]}
+            return
+        state[0] += 1
+        if salary < state[1]:
+            state[1] = salary
+        if salary > state[2]:
+            state[2] = salary
+        state[3] += salary
+        self.hierarchy[department].add(employee[2])
+
+    def update(self, employees: Iterable[list]) -> 'CorpStatistics':
+        """
+        Функция учитывает всех работников из employees
+        :param employees: итерируемый объект с работниками
+        :return: возвращается сам объект CorpStatistics
+        """
+        for employee in employees:
+            self.add(employee)
+        return self
+
+    def merge(self, other: 'CorpStatistics') -> 'CorpStatistics':
+        """
+        Функция добавляет статистику, собранную по другой части работников
+        :param other: объект CorpStatistics
+        :return: возвращается сам объект CorpStatistics
+        """
+        for department, (count, min_salary, max_salary, total_salary) in other.departments.items():
+            state = self.departments.get(department)
+            if state is None:
+                self.departments[department] = [count, min_salary, max_salary, total_salary]
+                self.hierarchy[department] = set(other.hierarchy[department])
+                continue
+            state[0] += count
+            state[1] = min(state[1], min_salary)
+            state[2] = max(state[2], max_salary)
+            state[3] += total_salary
+            self.hierarchy[department].update(other.hierarchy[department])
+        return self
+
+    def summary(self) -> list:
+        """
+        Функция формирует отчет о департаментах, отсортированный по
+        названию департамента
+        :return: список [департамент, численность, мин. зарплата,
+                 макс. зарплата, средняя зарплата]
+        """
+        summary_list = []
+        for department in sorted(self.departments):
+            count, min_salary, max_salary, total_salary = self.departments[department]
+            summary_list.append([department, count, min_salary, max_salary,
+                                 round(total_salary / count, 3)])
+        return summary_list
+
+    def teams_by_department(self) -> dict:
+        """
+        Функция возвращает иерархию команд
+        :return: словарь {департамент: отсортированный список команд},
+                 департаменты отсортированы по названию
+        """
+        return {department: sorted(self.hierarchy[department])
+                for department in sorted(self.hierarchy)}
+
+
+def rating_bucket(employee: list) -> str:
+    """
+    Функция относит оценку работника к интервалу шириной 0.5, ее можно
+    использовать как ключ группировки в GroupedStatistics
+    :param employee: работник (ФИО, департамент, команда, должность,
+                     оценка, зарплата)
+    :return: строка вида '4.0-4.5'
+    """
+    lower = math.floor(employee[4] * 2) / 2
+    return '{:.1f}-{:.1f}'.format(lower, lower + 0.5)
+
+
+class GroupedStatistics:
+    """
+    Класс собирает статистику по зарплатам за один проход по работникам
+    с группировкой по произвольному набору ключей. Квантили зарплат
+    (медиана, p90 и т.п.) оцениваются скетчем KllSketch, поэтому память
+    ограничена для каждой группы, а статистику частей данных можно
+    объединять функцией merge
+    """
+
+    def __init__(self, keys: list, employees: Iterable[list] = (), sketch_size: int = 200):
+        """
+        Инициализатор класса GroupedStatistics
+        keys - ключи группировки: название столбца из EMPLOYEE_COLUMNS
+               ('department', 'team', 'position', ...) или функция от
+               работника (например, rating_bucket); для обработки в пуле
+               процессов функция должна быть объявлена на уровне модуля
+        sketch_size - параметр точности k скетча KllSketch
+        groups - словарь {кортеж значений ключей: [численность,
+                 мин. зарплата, макс. зарплата, суммарная зарплата, скетч]}
+        :param employees: работники, которые сразу учитываются
+        """
+        self.keys = list(keys)
+        self.sketch_size = sketch_size
+        self.groups = {}
+        self.__getters = [itemgetter(EMPLOYEE_COLUMNS[key]) if isinstance(key, str) else key
+                          for key in self.keys]
+        self.update(employees)
+
+    def add(self, employee: list):
+        """
+        Функция учитывает одного работника
+        :param employee: работник (ФИО, департамент, команда, должность,
+                         оценка, зарплата)
+        :return: функция ничего не возвращает
+        """
+        key = tuple(getter(employee) for getter in self.__getters)
+        salary = employee[5]
+        state = self.groups.get(key)
+        if state is None:
+            state = self.groups[key] = [0, salary, salary, 0, KllSketch(self.sketch_size, seed=0)]
+        state[0] += 1
+        if salary < state[1]:
+            state[1] = salary
+        if salary > state[2]:
+            state[2] = salary
+        state[3] += salary
+        state[4].add(salary)
+
+    def update(self, employees: Iterable[list]) -> 'GroupedStatistics':
+        """
+        Функция учитывает всех работников из employees
+        :param employees: итерируемый объект с работниками
+        :return: возвращается сам объект GroupedStatistics
+        """
+        for employee in employees:
+            self.add(employee)
+        return self
+
+    def merge(self, other: 'GroupedStatistics') -> 'GroupedStatistics':
+        """
+        Функция добавляет статистику, собранную по другой части работников
+        с теми же ключами
+        :param other: объект GroupedStatistics
+        :return: возвращается сам объект GroupedStatistics
+        """
+        for key, (count, min_salary, max_salary, total_salary, sketch) in other.groups.items():
+            state = self.groups.get(key)
+            if state is None:
+                state = self.groups[key] = [0, min_salary, max_salary, 0,
+                                            KllSketch(self.sketch_size, seed=0)]
+            state[0] += count
+            state[1] = min(state[1], min_salary)
+            state[2] = max(state[2], max_salary)
+            state[3] += total_salary
+            state[4].merge(sketch)
+        return self
+
+    def titles(self, percentiles: Iterable[float] = (0.5, 0.9)) -> list:
+        """
+        Функция возвращает заголовки столбцов отчета report
+        :param percentiles: уровни квантилей, как в report
+        :return: список заголовков
+        """
+        key_titles = [key if isinstance(key, str) else key.__name__ for key in self.keys]
+        return key_titles + ['Численность', 'Мин. зарплата', 'Макс. зарплата', 'Средняя зарплата'] \
+            + ['p{:g} зарплата'.format(q * 100) for q in percentiles]
+
+    def report(self, percentiles: Iterable[float] = (0.5, 0.9)) -> list:
+        """
+        Функция формирует отчет по группам, отсортированный по ключам
+        :param percentiles: уровни квантилей зарплаты от 0 до 1
+        :return: список строк [значения ключей..., численность,
+                 мин. зарплата, макс. зарплата, средняя зарплата,
+                 квантили зарплаты...]
+        """
+        percentiles = list(percentiles)
+        report_list = []
+        for key in sorted(self.groups):
+            count, min_salary, max_salary, total_salary, sketch = self.groups[key]
+            report_list.append([*key, count, min_salary, max_salary,
+                                round(total_salary / count, 3), *sketch.quantiles(percentiles)])
+        return report_list
+
+
+def get_grouped_report(keys: list, path: str = CORP_SUMMARY_PATH,
+                       percentiles: Iterable[float] = (0.5, 0.9)) -> list:
+    """
+    Функция формирует отчет по зарплатам с группировкой по ключам
+    (см. GroupedStatistics) за один проход по файлу
+    :param keys: ключи группировки, например ['team', 'position']
+    :param path: строка, содержащая путь к файлу
+    :param percentiles: уровни квантилей зарплаты от 0 до 1
+    :return: возвращается отчет, представленный в виде списка
+    """
+    return GroupedStatistics(keys, iter_employees(path)).report(percentiles)
+
+
+def get_statistics(path: str = CORP_SUMMARY_PATH) -> CorpStatistics:
+    """
+    Функция собирает статистику по департаментам за один проход по файлу
+    :param path: строка, содержащая путь к файлу
+    :return: возвращается объект CorpStatistics
+    """
+    return CorpStatistics(iter_employees(path))
+
+
+def get_statistics_from_files(paths, n_jobs: int = -1, chunk_size: int = CHUNK_SIZE,
+                              keys: list = None):
+    """
+    Функция собирает статистику по нескольким файлам с работниками
+    (у каждого файла своя строка заголовка). Файлы делятся на фрагменты
+    примерно по chunk_size байт по границам строк, фрагменты разбираются
+    в пуле процессов, а их статистика объединяется. Результат совпадает
+    с однопроцессным чтением тех же файлов
+    :param paths: шаблон пути (например, 'Corp_Summary_*.csv') или
+                  список путей к файлам
+    :param n_jobs: число процессов (-1 или None - по числу ядер)
+    :param chunk_size: примерный размер фрагмента в байтах
+    :param keys: если заданы, статистика группируется по этим ключам
+                 (см. GroupedStatistics), иначе - по департаментам
+    :return: возвращается объект CorpStatistics или GroupedStatistics
+    """
+    files = sorted(glob.glob(paths)) if isinstance(paths, str) else list(paths)
+    if not files:
+        raise FileNotFoundError('Не найдено ни одного файла: {!r}'.format(paths))
+    chunks = [chunk for path in files for chunk in split_file(path, chunk_size)]
+    n_jobs = effective_n_jobs(n_jobs)
+    statistics = CorpStatistics() if keys is None else GroupedStatistics(keys)
+    chunk_statistics = partial(_chunk_statistics, keys=keys)
+    if n_jobs == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            statistics.merge(chunk_statistics(chunk))
+        return statistics
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        for partial_statistics in executor.map(chunk_statistics, chunks):
+            statistics.merge(partial_statistics)
+    return statistics
+
+
+def split_file(path: str, chunk_size: int = CHUNK_SIZE) -> list[tuple[str, int, int]]:
+    """
+    Функция делит файл с работниками на фрагменты. Строка относится к
+    фрагменту, в котором она начинается, поэтому границы фрагментов
+    можно брать без чтения файла, кроме строки заголовка
+    :param path: строка, содержащая путь к файлу
+    :param chunk_size: примерный размер фрагмента в байтах
+    :return: список фрагментов (путь, начало, конец) в байтах
+    """
+    with open(path, 'rb') as file:
+        start = len(file.readline())
+    size = os.path.getsize(path)
+    chunks = []
+    while start < size:
+        end = min(start + chunk_size, size)
+        chunks.append((path, start, end))
+        start = end
+    return chunks
+
+
+def _chunk_statistics(chunk: tuple[str, int, int], keys: list = None):
+    """
+    Функция собирает статистику по строкам, которые начинаются внутри
+    фрагмента файла. Выполняется в отдельном процессе
+    :param chunk: фрагмент (путь, начало, конец) в байтах
+    :param keys: ключи группировки (см. get_statistics_from_files)
+    :return: возвращается объект CorpStatistics или GroupedStatistics
+    """
+    path, start, end = chunk
+    encoding = locale.getpreferredencoding(False)
+    statistics = CorpStatistics() if keys is None else GroupedStatistics(keys)
+    with open(path, 'rb') as file:
+        # строка, начавшаяся до start, принадлежит предыдущему фрагменту
+        file.seek(start - 1)
+        position = start - 1 + len(file.readline())
+        while position < end:
+            line = file.readline()
+            if not line:
+                break
+            position += len(line)
+            statistics.add(parse_employee(line.decode(encoding)))
+    return statistics
+
+
+class CategoryColumn:
+    """
+    Столбец со словарным кодированием: каждое различное значение
+    хранится один раз, а для каждой строки - только его 4-байтовый код
+    """
+
+    def __init__(self):
+        """
+        Инициализатор класса CategoryColumn
+        values - список различных значений, код значения - его индекс
+        codes - массив кодов значений по строкам
+        """
+        self.values = []
+        self.codes = array('i')
+        self.__index = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.values[self.codes[i]]
+
+    def append(self, value: str):
+        """
+        Функция добавляет значение в конец столбца
+        :param value: значение
+        :return: функция ничего не возвращает
+        """
+        code = self.__index.get(value)
+        if code is None:
+            code = self.__index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+class EmployeeTable:
+    """
+    Класс хранит работников по столбцам: департамент, команда и должность
+    кодируются словарем (CategoryColumn), оценки и зарплаты лежат в
+    типизированных массивах array('d') и array('q'), ФИО - в одном буфере.
+    Работник занимает порядка десятков байт вместо сотен у списка строк
+    """
+
+    def __init__(self, employees: Iterable[list] = ()):
+        """
+        Инициализатор класса EmployeeTable
+        departments, teams, positions - столбцы CategoryColumn
+        ratings - массив оценок
+        salaries - массив зарплат
+        :param employees: работники, которые сразу добавляются в таблицу
+        """
+        self.departments = CategoryColumn()
+        self.teams = CategoryColumn()
+        self.positions = CategoryColumn()
+        self.ratings = array('d')
+        self.salaries = array('q')
+        self.__names = bytearray()
+        self.__name_offsets = array('q', [0])
+        self.extend(employees)
+
+    def __len__(self) -> int:
+        return len(self.salaries)
+
+    def append(self, employee: list):
+        """
+        Функция добавляет работника в таблицу
+        :param employee: работник (ФИО, департамент, команда, должность,
+                         оценка, зарплата)
+        :return: функция ничего не возвращает
+        """
+        self.__names += employee[0].encode('utf-8')
+        self.__name_offsets.append(len(self.__names))
+        self.departments.append(employee[1])
+        self.teams.append(employee[2])
+        self.positions.append(employee[3])
+        self.ratings.append(employee[4])
+        self.salaries.append(employee[5])
+
+    def extend(self, employees: Iterable[list]) -> 'EmployeeTable':
+        """
+        Функция добавляет в таблицу всех работников из employees
+        :param employees: итерируемый объект с работниками
+        :return: возвращается сам объект EmployeeTable
+        """
+        for employee in employees:
+            self.append(employee)
+        return self
+
+    def row(self, i: int) -> list:
+        """
+        Функция возвращает i-го работника в исходном виде
+        :param i: номер работника
+        :return: список (ФИО, департамент, команда, должность,
+                 оценка, зарплата)
+        """
+        name = self.__names[self.__name_offsets[i]:self.__name_offsets[i + 1]].decode('utf-8')
+        return [name, self.departments[i], self.teams[i], self.positions[i],
+                self.ratings[i], self.salaries[i]]
+
+    def summary(self) -> list:
+        """
+        Функция формирует отчет о департаментах группировкой по коду
+        департамента (с numpy - векторизованно: сортировка кодов и
+        reduceat по группам)
+        :return: список [департамент, численность, мин. зарплата,
+                 макс. зарплата, средняя зарплата], отсортированный
+                 по названию департамента
+        """
+        groups = self.__numpy_group_salaries() if np is not None else self.__group_salaries()
+        summary_list = []
+        for code in sorted(groups, key=lambda code: self.departments.values[code]):
+            count, min_salary, max_salary, total_salary = groups[code]
+            summary_list.append([self.departments.values[code], count, min_salary,
+                                 max_salary, round(total_salary / count, 3)])
+        return summary_list
+
+    def teams_by_department(self) -> dict:
+        """
+        Функция возвращает иерархию команд
+        :return: словарь {департамент: отсортированный список команд},
+                 департаменты отсортированы по названию
+        """
+        hierarchy = {}
+        for department_code, team_code in set(zip(self.departments.codes, self.teams.codes)):
+            hierarchy.setdefault(self.departments.values[department_code], []).append(
+                self.teams.values[team_code])
+        return {department: sorted(hierarchy[department]) for department in sorted(hierarchy)}
+
+    def __group_salaries(self) -> dict:
+        """
+        Функция считает численность, минимальную, максимальную и
+        суммарную зарплату по департаментам за один проход по массивам
+        :return: словарь {код департамента: [численность, мин., макс., сумма]}
+        """
+        groups = {}
+        for code, salary in zip(self.departments.codes, self.salaries):
+            state = groups.get(code)
+            if state is None:
+                groups[code] = [1, salary, salary, salary]
+                continue
+            state[0] += 1
+            if salary < state[1]:
+                state[1] = salary
+            if salary > state[2]:
+                state[2] = salary
+            state[3] += salary
+        return groups
+
+    def __numpy_group_salaries(self) -> dict:
+        """
+        Функция делает то же, что __group_salaries, с помощью numpy
+        (целочисленно, поэтому суммы совпадают точно)
+        :return: словарь {код департамента: [численность, мин., макс., сумма]}
+        """
+        if not len(self):
+            return {}
+        codes = np.frombuffer(self.departments.codes, dtype=np.int32)
+        salaries = np.frombuffer(self.salaries, dtype=np.int64)
+        order = np.argsort(codes, kind='stable')
+        sorted_codes, sorted_salaries = codes[order], salaries[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        counts = np.diff(np.r_[starts, len(sorted_codes)])
+        minimums = np.minimum.reduceat(sorted_salaries, starts)
+        maximums = np.maximum.reduceat(sorted_salaries, starts)
+        totals = np.add.reduceat(sorted_salaries, starts)
+        return {int(code): [int(count), int(minimum), int(maximum), int(total)]
+                for code, count, minimum, maximum, total
+                in zip(sorted_codes[starts], counts, minimums, maximums, totals)}
+
+
+def get_employee_table(path: str = CORP_SUMMARY_PATH) -> EmployeeTable:
+    """
+    Функция загружает работников из файла в столбцовую таблицу
+    :param path: строка, содержащая путь к файлу
+    :return: возвращается объект EmployeeTable
+    """
+    return EmployeeTable(iter_employees(path))
+
+
+def get_cached_statistics(path: str = CORP_SUMMARY_PATH,
+                          incremental: bool = False) -> CorpStatistics:
+    """
+    Функция возвращает статистику по файлу, запоминая ее вместе со временем
+    изменения и размером файла. Файл разбирается заново, только если он
+    изменился. В режиме incremental при увеличении файла разбираются
+    только строки, дописанные в конец после предыдущего чтения; последняя
+    строка без перевода строки может быть дописана не до конца, поэтому
+    она не учитывается, пока не появится перевод строки
+    :param path: строка, содержащая путь к файлу
+    :param incremental: если True, дописанные строки добавляются
+                        к уже собранной статистике
+    :return: возвращается объект CorpStatistics (его нельзя изменять)
+    """
+    key = os.path.abspath(path)
+    file_stat = os.stat(key)
+    entry = _statistics_cache.get(key)
+    if entry is not None and entry['mtime_ns'] == file_stat.st_mtime_ns \
+            and entry['size'] == file_stat.st_size and entry['incremental'] == incremental:
+        return entry['statistics']
+    if not incremental:
+        statistics = get_statistics(key)
+        _statistics_cache[key] = {'mtime_ns': file_stat.st_mtime_ns, 'size': file_stat.st_size,
+                                  'incremental': False, 'statistics': statistics}
+        return statistics
+    if entry is None or not entry['incremental'] or file_stat.st_size <= entry['size']:
+        entry = {'offset': 0, 'complete': CorpStatistics()}
+    entry['offset'] = _read_appended(key, entry['offset'], entry['complete'])
+    statistics = entry['complete']
+    entry.update(mtime_ns=file_stat.st_mtime_ns, size=file_stat.st_size,
+                 incremental=True, statistics=statistics)
+    _statistics_cache[key] = entry
+    return statistics
+
+
+def clear_statistics_cache():
+    """
+    Функция очищает кеш статистики get_cached_statistics
+    :return: функция ничего не возвращает
+    """
+    _statistics_cache.clear()
+
+
+def _read_appended(path: str, offset: int, statistics: CorpStatistics) -> int:
+    """
+    Функция учитывает в statistics работников, записанных в файле после
+    позиции offset. Последняя строка без перевода строки может быть
+    дописана не до конца, поэтому она пропускается и будет прочитана
+    при следующем вызове
+    :param path: строка, содержащая путь к файлу
+    :param offset: позиция в байтах, с которой начинается чтение
+                   (0 - начало файла, первая строка - заголовок)
+    :param statistics: объект CorpStatistics, который дополняется
+    :return: позиция после последней полной строки
+    """
+    encoding = locale.getpreferredencoding(False)
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        if offset == 0:
+            header = file.readline()
+            if not header.endswith(b'\n'):
+                return 0
+            offset = len(header)
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            statistics.add(parse_employee(line.decode(encoding)))
+            offset += len(line)
+    return offset
 
 
-def get_summary() -> list:
+def get_summary(statistics: CorpStatistics = None) -> list:
     """
     Функция формирует отчет о департаментах. Для каждого департамента
     указывается его численность, минимальная, максимальная и средняя зарплаты
+    :param statistics: уже собранная статистика (CorpStatistics или
+                       EmployeeTable); если не передана, файл
+                       Corp_Summary.csv читается заново
     :return: возвращается отчет, представленный в виде списка
     """
-    employees = get_employees('Corp_Summary.csv')
-    summary = {}
-    for employee in employees:
-        if employee[1] not in summary:
-            summary[employee[1]] = [0, 10 ** 6, 0, 0]
-        summary[employee[1]][0] += 1
-        if employee[5] < summary[employee[1]][1]:
-            summary[employee[1]][1] = employee[5]
-        if employee[5] > summary[employee[1]][2]:
-            summary[employee[1]][2] = employee[5]
-        summary[employee[1]][3] += employee[5]
-    for key in summary.keys():
-        summary[key][3] = round(summary[key][3] / summary[key][0], 3)
-    departments = sorted(list(summary.keys()))
-    summary_list = []
-    for department in departments:
-        summary_list.append([department, *summary[department]])
-    return summary_list
-
-
-def print_hierarchy():
+    if statistics is None:
+        statistics = get_statistics()
+    return statistics.summary()
+
+
+def print_hierarchy(statistics: CorpStatistics = None):
     """
     Функция печатает иерархию команд (департаменты и команды, которые
     в него входят)
+    :param statistics: уже собранная статистика (CorpStatistics или
+                       EmployeeTable); если не передана, файл
+                       Corp_Summary.csv читается заново
     :return: функция ничего не возвращает
     """
-    employees = get_employees('Corp_Summary.csv')
-    hierarchy = {}
-    for employee in employees:
-        if employee[1] not in hierarchy:
-            hierarchy[employee[1]] = set()
-        hierarchy[employee[1]].add(employee[2])
-    for key in hierarchy.keys():
-        hierarchy[key] = sorted(list(hierarchy[key]))
-    keys = sorted(list(hierarchy.keys()))
+    if statistics is None:
+        statistics = get_statistics()
+    hierarchy = statistics.teams_by_department()
+    keys = list(hierarchy.keys())
     print('\nИерархия команд:')
     for i in range(len(keys)):
         print(i + 1, '. ', keys[i], ': ', sep='')
@@ -67,12 +656,13 @@ def print_hierarchy():
     print()
 
 
-def print_summary():
+def print_summary(statistics: CorpStatistics = None):
     """
     Функция запрашивает отчет и затем выводит его на экран
+    :param statistics: уже собранная статистика (см. get_summary)
     :return: функция ничего не возвращает
     """
-    summary = get_summary()
+    summary = get_summary(statistics)
     for i in range(len(summary)):
         print(i + 1, '. ', summary[i][0], sep='')
         print('\tЧисленность: ', summary[i][1], '\n\tМин. зарплата: ',
@@ -81,24 +671,41 @@ def print_summary():
     print()
 
 
-def save_summary():
+def save_summary(statistics: CorpStatistics = None, destination='summary.csv',
+                 report_format: str = 'csv'):
     """
     Функция запрашивает отчет и сохраняет его в файл summary.csv
+    :param statistics: уже собранная статистика (см. get_summary)
+    :param destination: путь к файлу или открытый файловый объект
+    :param report_format: формат файла: 'csv', 'jsonl' или 'columnar'
+                          (см. report_writer.write_report)
     :return: функция ничего не возвращает
     """
     titles = ['Департамент', 'Численность', 'Мин. зарплата', 'Макс. зарплата', 'Средняя зарплата']
-    summary = get_summary()
-    file = open('summary.csv', 'w')
-    file.write(';'.join(titles) + '\n')
-    for department in summary:
-        file.write(';'.join(list(map(str, department))) + '\n')
-    file.close()
+    write_report(destination, titles, get_summary(statistics), report_format)
+
+
+def save_grouped_report(statistics: GroupedStatistics, destination, report_format: str = 'csv',
+                        percentiles: Iterable[float] = (0.5, 0.9)):
+    """
+    Функция сохраняет отчет GroupedStatistics в файл
+    :param statistics: объект GroupedStatistics
+    :param destination: путь к файлу или открытый файловый объект
+    :param report_format: формат файла: 'csv', 'jsonl' или 'columnar'
+    :param percentiles: уровни квантилей зарплаты от 0 до 1
+    :return: функция ничего не возвращает
+    """
+    write_report(destination, statistics.titles(percentiles),
+                 statistics.report(percentiles), report_format)
 
 
-def print_menu():
+def print_menu(incremental: bool = False):
     """
     Функция реализует логику меню. Пользователь выбирает команду,
-    которую он хочет выполнить
+    которую он хочет выполнить. Статистика по файлу с работниками
+    берется из кеша и пересчитывается, только если файл изменился
+    :param incremental: если True, при дописывании в файл разбираются
+                        только новые строки (см. get_cached_statistics)
     :return: функция ничего не возвращает
     """
     print('0. Выйти из программы',
@@ -113,12 +720,13 @@ def print_menu():
             print('Введен некорректный номер, повторите ввод: ', end='')
             operation = input()
             continue
+        statistics = get_cached_statistics(CORP_SUMMARY_PATH, incremental)
         if operation == '1':
-            print_hierarchy()
+            print_hierarchy(statistics)
         if operation == '2':
-            print_summary()
+            print_summary(statistics)
         if operation == '3':
-            save_summary()
+            save_summary(statistics)
             print('Отчет записан в файл summary.csv\n')
         print('Введите номер желаемой операции: ', end='')
         operation = input()
@@ -1,66 +1,277 @@
+from typing import Iterable, Iterator
+
+from parallel_counting import ShardCounts, effective_n_jobs, iter_shard_counts
+from sparse_matrix import CsrBuilder
+from text_analysis import Analyzer, document_frequency_limits
+
+
 class CountVectorizer:
     """
     В файле приведена реализация класса CountVectorizer,
     с помощью которого можно получить терм-документную матрицу
     """
 
-    def __init__(self):
+    def __init__(self, sparse: bool = False, n_jobs: int = 1, analyzer: Analyzer = None,
+                 min_df=1, max_df=1.0, max_features: int = None):
         """
         Инициализатор класа CountVectorizer.
+        analyzer - объект, разбивающий предложение на слова (Analyzer
+                   или любая функция; при n_jobs > 1 должна
+                   сериализоваться pickle), по умолчанию Analyzer()
+        min_df, max_df - слова, встречающиеся меньше чем в min_df или
+                         больше чем в max_df документах, отбрасываются
+                         после обучения (целое число - число документов,
+                         дробное - доля документов)
+        max_features - если задано, остается столько самых частых слов
+        sparse - если True, терм-документная матрица возвращается
+                 в разреженном формате CsrMatrix (indptr/indices/data)
+        n_jobs - число процессов для разбора и подсчета слов
+                 (-1 - по числу ядер); корпус делится на фрагменты,
+                 результат не зависит от n_jobs
         features - словарь (не множество, потому что важен порядок) для
-                   хранения всех слов в корпусе
+                   хранения всех слов в корпусе и числа их употреблений
+        vocabulary - словарь, сопоставляющий слову номер столбца
+        document_frequency - список, i-й элемент которого - число
+                             документов, содержащих слово из i-го столбца
+        n_documents - число документов, просмотренных при обучении
+        pruned_terms - множество слов, отброшенных по min_df, max_df и
+                       max_features; их частоты не хранятся, поэтому
+                       partial_fit не возвращает их в словарь
         count_matrix - терм-документная матрица,
                        которую необходимо получить
         """
+        self.sparse = sparse
+        self.n_jobs = n_jobs
+        self.analyzer = analyzer if analyzer is not None else Analyzer()
+        self.min_df = min_df
+        self.max_df = max_df
+        self.max_features = max_features
         self.features = {}
+        self.vocabulary = {}
+        self.document_frequency = []
+        self.n_documents = 0
+        self.pruned_terms = set()
         self.count_matrix = []
 
-    def fit_transform(self, corpus: list) -> list:
+    def fit(self, corpus: Iterable[str]) -> 'CountVectorizer':
+        """
+        Функция определяет все уникальные слова в корпусе и отбрасывает
+        слова согласно min_df, max_df и max_features.
+        Корпус просматривается один раз и целиком в памяти не хранится,
+        поэтому можно передавать генератор или открытый файл
+        :param corpus: итерируемый объект с предложениями (каждое
+                       предложение - строка, состоящая из слов,
+                       разделенных пробелом)
+        :return: возвращается сам объект CountVectorizer
+        """
+        self.__reset()
+        self.partial_fit(corpus)
+        self.__prune()
+        return self
+
+    def partial_fit(self, batch: Iterable[str]) -> 'CountVectorizer':
+        """
+        Функция дополняет словарь и частоты слов документами из batch,
+        не сбрасывая результаты предыдущих вызовов. Отбор слов по
+        min_df, max_df и max_features не выполняется, так как для него
+        нужны частоты по всему корпусу; слова, уже отброшенные при
+        обучении (pruned_terms), в словарь не добавляются
+        :param batch: итерируемый объект с предложениями
+        :return: возвращается сам объект CountVectorizer
+        """
+        if effective_n_jobs(self.n_jobs) > 1:
+            for shard in iter_shard_counts(batch, self.n_jobs, self.analyzer, build_matrix=False):
+                self.__merge(shard)
+            return self
+        for _ in self.__fit(map(self.analyzer, batch)):
+            pass
+        return self
+
+    def transform(self, corpus: Iterable[str]):
+        """
+        Функция строит терм-документную матрицу по уже найденному
+        словарю. Слова, которых нет в словаре, пропускаются
+        :param corpus: итерируемый объект с предложениями
+        :return: возвращается терм-документная матрица
+                 (список списков или CsrMatrix, если sparse=True)
+        """
+        if effective_n_jobs(self.n_jobs) > 1:
+            return self.__output(self.__parallel_transform(corpus, fit=False))
+        return self.__output(self.__transform(map(self.analyzer, corpus)))
+
+    def fit_transform(self, corpus: Iterable[str]):
         """
         Функция принимает список предложений и
-        возвращает терм-документную матрицу
+        возвращает терм-документную матрицу.
+        Обучение и подсчет слов выполняются за один проход по корпусу
         :param corpus: список предложений (каждое предложение - строка,
                        состоящая из слов, разделенных пробелом)
         :return: возвращается список, представляющий собой
-                 терм-документную матрицу
+                 терм-документную матрицу (или CsrMatrix, если sparse=True)
+        """
+        self.__reset()
+        if effective_n_jobs(self.n_jobs) > 1:
+            count_matrix = self.__parallel_transform(corpus, fit=True)
+        else:
+            count_matrix = self.__transform(self.__fit(map(self.analyzer, corpus)))
+        column_mapping = self.__prune()
+        if column_mapping is not None:
+            builder = CsrBuilder()
+            builder.extend(count_matrix, column_mapping)
+            count_matrix = builder.build(len(self.vocabulary))
+        self.count_matrix = self.__output(count_matrix)
+        return self.count_matrix
+
+    def __reset(self):
+        """
+        Функция сбрасывает результаты предыдущего обучения
+        :return: функция ничего не возвращает
         """
         self.features = {}
+        self.vocabulary = {}
+        self.document_frequency = []
+        self.n_documents = 0
+        self.pruned_terms = set()
         self.count_matrix = []
-        corpus = list(map(lambda x: x.lower().split(), corpus))
-        self.__fit(corpus)
-        self.__transform(corpus)
-        return self.count_matrix
 
-    def __fit(self, corpus: list):
+    def __prune(self) -> list:
+        """
+        Функция отбрасывает слова, документная частота которых выходит
+        за пределы min_df и max_df, и оставляет не более max_features
+        самых частых слов (по числу употреблений из self.features).
+        Порядок оставшихся слов сохраняется, отброшенные слова
+        запоминаются в self.pruned_terms
+        :return: список, i-й элемент которого - новый номер i-го столбца
+                 (-1 для отброшенного слова), или None, если ничего
+                 не отбрасывается
+        """
+        min_count, max_count = document_frequency_limits(self.min_df, self.max_df, self.n_documents)
+        terms = [term for term, column in self.vocabulary.items()
+                 if min_count <= self.document_frequency[column] <= max_count]
+        if self.max_features is not None and len(terms) > self.max_features:
+            top_terms = set(sorted(terms, key=lambda term: -self.features[term])[:self.max_features])
+            terms = [term for term in terms if term in top_terms]
+        if len(terms) == len(self.vocabulary):
+            return None
+        kept_terms = set(terms)
+        self.pruned_terms.update(term for term in self.vocabulary if term not in kept_terms)
+        column_mapping = [-1] * len(self.vocabulary)
+        features, vocabulary, document_frequency = {}, {}, []
+        for term in terms:
+            column = self.vocabulary[term]
+            column_mapping[column] = len(vocabulary)
+            vocabulary[term] = len(vocabulary)
+            features[term] = self.features[term]
+            document_frequency.append(self.document_frequency[column])
+        self.features = features
+        self.vocabulary = vocabulary
+        self.document_frequency = document_frequency
+        return column_mapping
+
+    def __output(self, count_matrix):
+        """
+        Функция приводит терм-документную матрицу к выходному формату
+        :param count_matrix: терм-документная матрица CsrMatrix
+        :return: CsrMatrix, если sparse=True, иначе список списков
+        """
+        return count_matrix if self.sparse else count_matrix.toarray()
+
+    def __fit(self, corpus: Iterable[list]) -> Iterator[list]:
         """
         Функция наполняет self.features (определяет все
-        уникальные слова, которые есть в тексте)
-        :param corpus: список предложений (каждое предложение -
-                       список слов, полученный из исходного предложения
-                       с помощью split())
-        :return: функция ничего не возвращает
+        уникальные слова, которые есть в тексте) и считает, в скольких
+        документах встречается каждое слово (кроме self.pruned_terms).
+        Предложения возвращаются
+        по одному сразу после обработки, чтобы fit_transform мог
+        составлять матрицу за тот же проход по корпусу
+        :param corpus: итерируемый объект с предложениями (каждое
+                       предложение - список слов, полученный из исходного
+                       предложения с помощью analyzer)
+        :return: генератор обработанных предложений
         """
+        pruned_terms = self.pruned_terms
         for sentence in corpus:
-            for word in sentence:
+            self.n_documents += 1
+            words = [word for word in sentence if word not in pruned_terms] \
+                if pruned_terms else sentence
+            for word in words:
                 if word not in self.features:
                     self.features[word] = 0
+                    self.vocabulary[word] = len(self.vocabulary)
+                    self.document_frequency.append(0)
                 self.features[word] += 1
+            for word in set(words):
+                self.document_frequency[self.vocabulary[word]] += 1
+            yield sentence
 
-    def __transform(self, corpus: list):
+    def __transform(self, corpus: Iterable[list]):
         """
         Функция непосредственно составляет терм-документную матрицу,
-        используя имеющийся набор слов в корпусе
-        :param corpus: список предложений (каждое предложение -
-                       список слов, полученный из исходного предложения
-                       с помощью split())
-        :return: функция ничего не возвращает
+        используя имеющийся набор слов в корпусе. Каждое предложение
+        просматривается один раз, номер столбца слова берется из
+        self.vocabulary, поэтому время и память пропорциональны
+        количеству ненулевых элементов
+        :param corpus: итерируемый объект с предложениями (каждое
+                       предложение - список слов, полученный из исходного
+                       предложения с помощью analyzer)
+        :return: возвращается терм-документная матрица CsrMatrix
         """
-        feature_keys = list(self.features.keys())
+        builder = CsrBuilder()
         for sentence in corpus:
-            words_frequency = [0] * len(self.features)
-            for i in range(len(self.features)):
-                words_frequency[i] = sentence.count(feature_keys[i])
-            self.count_matrix.append(words_frequency)
+            words_frequency = {}
+            for word in sentence:
+                column = self.vocabulary.get(word)
+                if column is not None:
+                    words_frequency[column] = words_frequency.get(column, 0) + 1
+            builder.append_row(words_frequency)
+        return builder.build(len(self.vocabulary))
+
+    def __parallel_transform(self, corpus: Iterable[str], fit: bool):
+        """
+        Функция составляет терм-документную матрицу в пуле процессов.
+        Каждый процесс считает слова в своем фрагменте корпуса со своим
+        словарем, после чего фрагменты по порядку объединяются, поэтому
+        порядок столбцов совпадает с однопроцессным вариантом
+        :param corpus: итерируемый объект с предложениями
+        :param fit: если True, словарь дополняется словами фрагментов,
+                    иначе слова не из словаря пропускаются
+        :return: возвращается терм-документная матрица CsrMatrix
+        """
+        builder = CsrBuilder()
+        for shard in iter_shard_counts(corpus, self.n_jobs, self.analyzer):
+            if fit:
+                column_mapping = self.__merge(shard)
+            else:
+                column_mapping = [self.vocabulary.get(term, -1) for term in shard.terms]
+            builder.extend(shard.count_matrix, column_mapping)
+        return builder.build(len(self.vocabulary))
+
+    def __merge(self, shard: ShardCounts) -> list:
+        """
+        Функция добавляет в словарь слова фрагмента корпуса в порядке
+        их первого появления и суммирует частоты; слова из
+        self.pruned_terms пропускаются
+        :param shard: результат подсчета слов во фрагменте
+        :return: список, j-й элемент которого - номер столбца
+                 j-го слова фрагмента в общем словаре (-1 для
+                 пропущенного слова)
+        """
+        column_mapping = []
+        for term, count, frequency in zip(shard.terms, shard.term_counts,
+                                          shard.document_frequency):
+            column = self.vocabulary.get(term)
+            if column is None:
+                if term in self.pruned_terms:
+                    column_mapping.append(-1)
+                    continue
+                column = self.vocabulary[term] = len(self.vocabulary)
+                self.features[term] = 0
+                self.document_frequency.append(0)
+            self.features[term] += count
+            self.document_frequency[column] += frequency
+            column_mapping.append(column)
+        self.n_documents += shard.n_documents
+        return column_mapping
 
     def get_feature_names(self) -> list:
         """
@@ -84,6 +295,8 @@ def solution():
     count_matrix = vectorizer.fit_transform(corpus)
     print(vectorizer.get_feature_names())
     print(count_matrix)
+    sparse_matrix = CountVectorizer(sparse=True).fit_transform(corpus)
+    print(sparse_matrix.indptr, sparse_matrix.indices, sparse_matrix.data)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,19 @@
 import math
+import zlib
+from array import array
+from contextlib import nullcontext
+from typing import Iterable, Iterator
+
+from binary_storage import read_arrays, write_arrays
+from instrumentation import Instrumentation
+from parallel_counting import ShardCounts, effective_n_jobs, iter_shard_counts
+from sparse_matrix import CsrBuilder, CsrMatrix
+from text_analysis import Analyzer, document_frequency_limits
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class CountVectorizer:
@@ -7,61 +22,342 @@ class CountVectorizer:
     с помощью которого можно получить терм-документную матрицу
     """
 
-    def __init__(self):
+    def __init__(self, sparse: bool = False, n_jobs: int = 1, analyzer: Analyzer = None,
+                 min_df=1, max_df=1.0, max_features: int = None,
+                 instrumentation: Instrumentation = None):
         """
         Инициализатор класа CountVectorizer.
+        analyzer - объект, разбивающий предложение на слова (Analyzer
+                   или любая функция; при n_jobs > 1 должна
+                   сериализоваться pickle), по умолчанию Analyzer()
+        min_df, max_df - слова, встречающиеся меньше чем в min_df или
+                         больше чем в max_df документах, отбрасываются
+                         после обучения (целое число - число документов,
+                         дробное - доля документов)
+        max_features - если задано, остается столько самых частых слов
+        sparse - если True, терм-документная матрица возвращается
+                 в разреженном формате CsrMatrix (indptr/indices/data)
+        n_jobs - число процессов для разбора и подсчета слов
+                 (-1 - по числу ядер); корпус делится на фрагменты,
+                 результат не зависит от n_jobs
+        instrumentation - если задан объект Instrumentation, в него
+                          собирается время и объем работы этапов
+                          (tokenize, fit, count, prune, densify);
+                          по умолчанию None - ничего не измеряется
         features - словарь (не множество, потому что важен порядок) для
-                   хранения всех слов в корпусе
+                   хранения всех слов в корпусе и числа их употреблений
+        vocabulary - словарь, сопоставляющий слову номер столбца
+        document_frequency - список, i-й элемент которого - число
+                             документов, содержащих слово из i-го столбца
+        n_documents - число документов, просмотренных при обучении
+        pruned_terms - множество слов, отброшенных по min_df, max_df и
+                       max_features; их частоты не хранятся, поэтому
+                       partial_fit не возвращает их в словарь
         count_matrix - терм-документная матрица,
                        которую необходимо получить
         """
+        self.sparse = sparse
+        self.n_jobs = n_jobs
+        self.analyzer = analyzer if analyzer is not None else Analyzer()
+        self.min_df = min_df
+        self.max_df = max_df
+        self.max_features = max_features
+        self.instrumentation = instrumentation
         self.features = {}
+        self.vocabulary = {}
+        self.document_frequency = []
+        self.n_documents = 0
+        self.pruned_terms = set()
         self.count_matrix = []
 
-    def fit_transform(self, corpus: list) -> list:
+    def fit(self, corpus: Iterable[str]) -> 'CountVectorizer':
+        """
+        Функция определяет все уникальные слова в корпусе и отбрасывает
+        слова согласно min_df, max_df и max_features.
+        Корпус просматривается один раз и целиком в памяти не хранится,
+        поэтому можно передавать генератор или открытый файл
+        :param corpus: итерируемый объект с предложениями (каждое
+                       предложение - строка, состоящая из слов,
+                       разделенных пробелом)
+        :return: возвращается сам объект CountVectorizer
+        """
+        self.__reset()
+        # не self.partial_fit: в TfidfVectorizer он еще и пересчитывает
+        # idf, а при обучении idf нужны только после отбора слов
+        CountVectorizer.partial_fit(self, corpus)
+        with self.__stage('prune'):
+            self.__prune()
+        self.__record_vocabulary()
+        return self
+
+    def partial_fit(self, batch: Iterable[str]) -> 'CountVectorizer':
+        """
+        Функция дополняет словарь и частоты слов документами из batch,
+        не сбрасывая результаты предыдущих вызовов. Отбор слов по
+        min_df, max_df и max_features не выполняется, так как для него
+        нужны частоты по всему корпусу; слова, уже отброшенные при
+        обучении (pruned_terms), в словарь не добавляются
+        :param batch: итерируемый объект с предложениями
+        :return: возвращается сам объект CountVectorizer
+        """
+        if effective_n_jobs(self.n_jobs) > 1:
+            with self.__stage('parallel_fit') as record:
+                n_documents = self.n_documents
+                for shard in iter_shard_counts(batch, self.n_jobs, self.analyzer, build_matrix=False):
+                    self.__merge(shard)
+                if record is not None:
+                    record.documents = self.n_documents - n_documents
+        else:
+            for _ in self.__iterate('fit', self.__fit(self.__tokenize(batch))):
+                pass
+        self.__record_vocabulary()
+        return self
+
+    def transform(self, corpus: Iterable[str]):
+        """
+        Функция строит терм-документную матрицу по уже найденному
+        словарю. Слова, которых нет в словаре, пропускаются
+        :param corpus: итерируемый объект с предложениями
+        :return: возвращается терм-документная матрица
+                 (список списков или CsrMatrix, если sparse=True)
+        """
+        if effective_n_jobs(self.n_jobs) > 1:
+            with self.__stage('parallel_count') as record:
+                count_matrix = self.__parallel_transform(corpus, fit=False)
+                _record_matrix(record, count_matrix)
+        else:
+            with self.__stage('count') as record:
+                count_matrix = self.__transform(self.__tokenize(corpus))
+                _record_matrix(record, count_matrix)
+        return self.__output(count_matrix)
+
+    def fit_transform(self, corpus: Iterable[str]):
         """
         Функция принимает список предложений и
-        возвращает терм-документную матрицу
+        возвращает терм-документную матрицу.
+        Обучение и подсчет слов выполняются за один проход по корпусу
         :param corpus: список предложений (каждое предложение - строка,
                        состоящая из слов, разделенных пробелом)
         :return: возвращается список, представляющий собой
-                 терм-документную матрицу
+                 терм-документную матрицу (или CsrMatrix, если sparse=True)
+        """
+        self.__reset()
+        if effective_n_jobs(self.n_jobs) > 1:
+            with self.__stage('parallel_count') as record:
+                count_matrix = self.__parallel_transform(corpus, fit=True)
+                _record_matrix(record, count_matrix)
+        else:
+            with self.__stage('count') as record:
+                count_matrix = self.__transform(
+                    self.__iterate('fit', self.__fit(self.__tokenize(corpus))))
+                _record_matrix(record, count_matrix)
+        with self.__stage('prune') as record:
+            column_mapping = self.__prune()
+            if column_mapping is not None:
+                builder = CsrBuilder()
+                builder.extend(count_matrix, column_mapping)
+                count_matrix = builder.build(len(self.vocabulary))
+            _record_matrix(record, count_matrix)
+        self.__record_vocabulary()
+        self.count_matrix = self.__output(count_matrix)
+        return self.count_matrix
+
+    def __reset(self):
+        """
+        Функция сбрасывает результаты предыдущего обучения
+        :return: функция ничего не возвращает
         """
         self.features = {}
+        self.vocabulary = {}
+        self.document_frequency = []
+        self.n_documents = 0
+        self.pruned_terms = set()
         self.count_matrix = []
-        corpus = list(map(lambda x: x.lower().split(), corpus))
-        self.__fit(corpus)
-        self.__transform(corpus)
-        return self.count_matrix
 
-    def __fit(self, corpus: list):
+    def __prune(self) -> list:
         """
-        Функция наполняет self.features (определяет все
-        уникальные слова, которые есть в тексте)
-        :param corpus: список предложений (каждое предложение -
-                       список слов, полученный из исходного предложения
-                       с помощью split())
+        Функция отбрасывает слова, документная частота которых выходит
+        за пределы min_df и max_df, и оставляет не более max_features
+        самых частых слов (по числу употреблений из self.features).
+        Порядок оставшихся слов сохраняется, отброшенные слова
+        запоминаются в self.pruned_terms
+        :return: список, i-й элемент которого - новый номер i-го столбца
+                 (-1 для отброшенного слова), или None, если ничего
+                 не отбрасывается
+        """
+        min_count, max_count = document_frequency_limits(self.min_df, self.max_df, self.n_documents)
+        terms = [term for term, column in self.vocabulary.items()
+                 if min_count <= self.document_frequency[column] <= max_count]
+        if self.max_features is not None and len(terms) > self.max_features:
+            top_terms = set(sorted(terms, key=lambda term: -self.features[term])[:self.max_features])
+            terms = [term for term in terms if term in top_terms]
+        if len(terms) == len(self.vocabulary):
+            return None
+        kept_terms = set(terms)
+        self.pruned_terms.update(term for term in self.vocabulary if term not in kept_terms)
+        column_mapping = [-1] * len(self.vocabulary)
+        features, vocabulary, document_frequency = {}, {}, []
+        for term in terms:
+            column = self.vocabulary[term]
+            column_mapping[column] = len(vocabulary)
+            vocabulary[term] = len(vocabulary)
+            features[term] = self.features[term]
+            document_frequency.append(self.document_frequency[column])
+        self.features = features
+        self.vocabulary = vocabulary
+        self.document_frequency = document_frequency
+        return column_mapping
+
+    def __output(self, count_matrix):
+        """
+        Функция приводит терм-документную матрицу к выходному формату
+        :param count_matrix: терм-документная матрица CsrMatrix
+        :return: CsrMatrix, если sparse=True, иначе список списков
+        """
+        if self.sparse:
+            return count_matrix
+        with self.__stage('densify'):
+            return count_matrix.toarray()
+
+    def __tokenize(self, corpus: Iterable[str]) -> Iterator[list]:
+        """
+        Функция разбивает предложения на слова с помощью analyzer;
+        при заданном instrumentation время разбора измеряется
+        :param corpus: итерируемый объект с предложениями
+        :return: итератор списков слов
+        """
+        sentences = map(self.analyzer, corpus)
+        if self.instrumentation is None:
+            return sentences
+        return self.instrumentation.iterate('tokenize', sentences, count_tokens=True)
+
+    def __iterate(self, name: str, sentences: Iterator[list]) -> Iterator[list]:
+        """
+        Функция измеряет этап, обрабатывающий предложения по одному,
+        если задан instrumentation
+        :param name: имя этапа
+        :param sentences: итератор предложений
+        :return: итератор тех же предложений
+        """
+        if self.instrumentation is None:
+            return sentences
+        return self.instrumentation.iterate(name, sentences)
+
+    def __stage(self, name: str):
+        """
+        Функция возвращает контекстный менеджер, измеряющий этап,
+        или пустой контекстный менеджер, если instrumentation не задан
+        :param name: имя этапа
+        :return: контекстный менеджер, возвращающий StageStats или None
+        """
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.stage(name)
+
+    def __record_vocabulary(self):
+        """
+        Функция запоминает размер словаря в instrumentation
         :return: функция ничего не возвращает
         """
+        if self.instrumentation is not None:
+            self.instrumentation.vocabulary_size = len(self.vocabulary)
+
+    def __fit(self, corpus: Iterable[list]) -> Iterator[list]:
+        """
+        Функция наполняет self.features (определяет все
+        уникальные слова, которые есть в тексте) и считает, в скольких
+        документах встречается каждое слово (кроме self.pruned_terms).
+        Предложения возвращаются
+        по одному сразу после обработки, чтобы fit_transform мог
+        составлять матрицу за тот же проход по корпусу
+        :param corpus: итерируемый объект с предложениями (каждое
+                       предложение - список слов, полученный из исходного
+                       предложения с помощью analyzer)
+        :return: генератор обработанных предложений
+        """
+        pruned_terms = self.pruned_terms
         for sentence in corpus:
-            for word in sentence:
-                self.features[word] = 1
+            self.n_documents += 1
+            words = [word for word in sentence if word not in pruned_terms] \
+                if pruned_terms else sentence
+            for word in words:
+                if word not in self.features:
+                    self.features[word] = 0
+                    self.vocabulary[word] = len(self.vocabulary)
+                    self.document_frequency.append(0)
+                self.features[word] += 1
+            for word in set(words):
+                self.document_frequency[self.vocabulary[word]] += 1
+            yield sentence
 
-    def __transform(self, corpus: list):
+    def __transform(self, corpus: Iterable[list]):
         """
         Функция непосредственно составляет терм-документную матрицу,
-        используя имеющийся набор слов в корпусе
-        :param corpus: список предложений (каждое предложение -
-                       список слов, полученный из исходного предложения
-                       с помощью split())
-        :return: функция ничего не возвращает
+        используя имеющийся набор слов в корпусе. Каждое предложение
+        просматривается один раз, номер столбца слова берется из
+        self.vocabulary, поэтому время и память пропорциональны
+        количеству ненулевых элементов
+        :param corpus: итерируемый объект с предложениями (каждое
+                       предложение - список слов, полученный из исходного
+                       предложения с помощью analyzer)
+        :return: возвращается терм-документная матрица CsrMatrix
         """
-        feature_keys = list(self.features.keys())
+        builder = CsrBuilder()
         for sentence in corpus:
-            words_frequency = [0] * len(self.features)
-            for i in range(len(self.features)):
-                words_frequency[i] = sentence.count(feature_keys[i])
-            self.count_matrix.append(words_frequency)
+            words_frequency = {}
+            for word in sentence:
+                column = self.vocabulary.get(word)
+                if column is not None:
+                    words_frequency[column] = words_frequency.get(column, 0) + 1
+            builder.append_row(words_frequency)
+        return builder.build(len(self.vocabulary))
+
+    def __parallel_transform(self, corpus: Iterable[str], fit: bool):
+        """
+        Функция составляет терм-документную матрицу в пуле процессов.
+        Каждый процесс считает слова в своем фрагменте корпуса со своим
+        словарем, после чего фрагменты по порядку объединяются, поэтому
+        порядок столбцов совпадает с однопроцессным вариантом
+        :param corpus: итерируемый объект с предложениями
+        :param fit: если True, словарь дополняется словами фрагментов,
+                    иначе слова не из словаря пропускаются
+        :return: возвращается терм-документная матрица CsrMatrix
+        """
+        builder = CsrBuilder()
+        for shard in iter_shard_counts(corpus, self.n_jobs, self.analyzer):
+            if fit:
+                column_mapping = self.__merge(shard)
+            else:
+                column_mapping = [self.vocabulary.get(term, -1) for term in shard.terms]
+            builder.extend(shard.count_matrix, column_mapping)
+        return builder.build(len(self.vocabulary))
+
+    def __merge(self, shard: ShardCounts) -> list:
+        """
+        Функция добавляет в словарь слова фрагмента корпуса в порядке
+        их первого появления и суммирует частоты; слова из
+        self.pruned_terms пропускаются
+        :param shard: результат подсчета слов во фрагменте
+        :return: список, j-й элемент которого - номер столбца
+                 j-го слова фрагмента в общем словаре (-1 для
+                 пропущенного слова)
+        """
+        column_mapping = []
+        for term, count, frequency in zip(shard.terms, shard.term_counts,
+                                          shard.document_frequency):
+            column = self.vocabulary.get(term)
+            if column is None:
+                if term in self.pruned_terms:
+                    column_mapping.append(-1)
+                    continue
+                column = self.vocabulary[term] = len(self.vocabulary)
+                self.features[term] = 0
+                self.document_frequency.append(0)
+            self.features[term] += count
+            self.document_frequency[column] += frequency
+            column_mapping.append(column)
+        self.n_documents += shard.n_documents
+        return column_mapping
 
     def get_feature_names(self) -> list:
         """
@@ -70,16 +366,351 @@ class CountVectorizer:
         """
         return list(self.features.keys())
 
+    def save(self, path: str):
+        """
+        Функция сохраняет обученный объект в двоичный файл: параметры
+        записываются в заголовок, а словарь, частоты слов и найденные
+        матрицы - непрерывными типизированными массивами
+        :param path: путь к файлу
+        :return: функция ничего не возвращает
+        """
+        header, arrays = self._binary_state()
+        write_arrays(path, header, arrays)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False):
+        """
+        Функция загружает объект, сохраненный функцией save
+        :param path: путь к файлу
+        :param mmap: если True, файл отображается в память, и массивы
+                     (idf, разреженные матрицы) не копируются, поэтому
+                     один файл могут использовать несколько процессов
+        :return: возвращается загруженный объект
+        """
+        header, arrays = read_arrays(path, mmap)
+        if header['class'] != cls.__name__:
+            raise ValueError('В файле сохранен {}, а не {}'.format(header['class'], cls.__name__))
+        params = header['params']
+        vectorizer = cls(sparse=params['sparse'], n_jobs=params['n_jobs'],
+                         analyzer=Analyzer(**header['analyzer']),
+                         min_df=params['min_df'], max_df=params['max_df'],
+                         max_features=params['max_features'])
+        vectorizer._load_binary_state(header, arrays)
+        return vectorizer
+
+    def _binary_state(self) -> tuple[dict, dict]:
+        """
+        Функция собирает заголовок и массивы для сохранения в файл
+        :return: кортеж (заголовок, словарь {имя: (typecode, массив)})
+        """
+        if not isinstance(self.analyzer, Analyzer):
+            raise ValueError('Сохранить можно только объект с analyzer класса Analyzer')
+        vocabulary_offsets, vocabulary = _encode_terms(self.vocabulary)
+        pruned_offsets, pruned_terms = _encode_terms(sorted(self.pruned_terms))
+        header = {
+            'class': type(self).__name__,
+            'params': {
+                'sparse': self.sparse,
+                'n_jobs': self.n_jobs,
+                'min_df': self.min_df,
+                'max_df': self.max_df,
+                'max_features': self.max_features,
+            },
+            'analyzer': self.analyzer.get_params(),
+            'n_documents': self.n_documents,
+            'matrices': {},
+        }
+        arrays = {
+            'vocabulary_offsets': ('q', vocabulary_offsets),
+            'vocabulary': ('B', vocabulary),
+            'pruned_terms_offsets': ('q', pruned_offsets),
+            'pruned_terms': ('B', pruned_terms),
+            'features': ('q', [self.features[term] for term in self.vocabulary]),
+            'document_frequency': ('q', self.document_frequency),
+        }
+        _add_matrix(header, arrays, 'count_matrix', self.count_matrix, 'q')
+        return header, arrays
+
+    def _load_binary_state(self, header: dict, arrays: dict):
+        """
+        Функция восстанавливает состояние объекта из заголовка и массивов
+        :param header: заголовок файла
+        :param arrays: словарь {имя: массив}
+        :return: функция ничего не возвращает
+        """
+        terms = _decode_terms(arrays['vocabulary_offsets'], arrays['vocabulary'])
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        self.features = dict(zip(terms, arrays['features']))
+        self.document_frequency = list(arrays['document_frequency'])
+        self.n_documents = header['n_documents']
+        if 'pruned_terms' in arrays:
+            # в файлах прежних версий отброшенные слова не сохранялись
+            self.pruned_terms = set(_decode_terms(arrays['pruned_terms_offsets'],
+                                                  arrays['pruned_terms']))
+        self.count_matrix = _read_matrix(header, arrays, 'count_matrix')
+
+
+class HashingVectorizer:
+    """
+    В файле приведена реализация класса HashingVectorizer. Слово
+    отображается в один из n_features столбцов по значению хеш-функции,
+    поэтому словарь не хранится, обучение не требуется, а память
+    не зависит от числа различных слов
+    """
+
+    def __init__(self, n_features: int = 2 ** 20, alternate_sign: bool = True,
+                 sparse: bool = True, analyzer: Analyzer = None):
+        """
+        Инициализатор класса HashingVectorizer
+        analyzer - объект, разбивающий предложение на слова,
+                   по умолчанию Analyzer()
+        n_features - число столбцов терм-документной матрицы
+        alternate_sign - если True, знак значения тоже определяется хешем,
+                         чтобы коллизии в среднем компенсировали друг друга
+        sparse - если True, матрица возвращается в формате CsrMatrix
+                 (при большом n_features плотная матрица непрактична)
+        """
+        self.n_features = n_features
+        self.alternate_sign = alternate_sign
+        self.sparse = sparse
+        self.analyzer = analyzer if analyzer is not None else Analyzer()
+
+    def fit(self, corpus: Iterable[str] = None) -> 'HashingVectorizer':
+        """
+        Функция ничего не делает: HashingVectorizer не требует обучения
+        :param corpus: не используется
+        :return: возвращается сам объект HashingVectorizer
+        """
+        return self
+
+    def partial_fit(self, batch: Iterable[str] = None) -> 'HashingVectorizer':
+        """
+        Функция ничего не делает: HashingVectorizer не требует обучения
+        :param batch: не используется
+        :return: возвращается сам объект HashingVectorizer
+        """
+        return self
+
+    def transform(self, corpus: Iterable[str]):
+        """
+        Функция строит терм-документную матрицу с n_features столбцами
+        :param corpus: итерируемый объект с предложениями (каждое
+                       предложение - строка, состоящая из слов,
+                       разделенных пробелом)
+        :return: возвращается терм-документная матрица
+                 (CsrMatrix или список списков, если sparse=False)
+        """
+        builder = CsrBuilder()
+        for sentence in corpus:
+            words_frequency = {}
+            for word in self.analyzer(sentence):
+                column, sign = self.__hash(word)
+                words_frequency[column] = words_frequency.get(column, 0) + sign
+            builder.append_row(words_frequency)
+        count_matrix = builder.build(self.n_features)
+        return count_matrix if self.sparse else count_matrix.toarray()
+
+    def fit_transform(self, corpus: Iterable[str]):
+        """
+        Функция совпадает с transform, так как обучение не требуется
+        :param corpus: итерируемый объект с предложениями
+        :return: возвращается терм-документная матрица
+        """
+        return self.transform(corpus)
+
+    def __hash(self, word: str) -> tuple[int, int]:
+        """
+        Функция вычисляет номер столбца и знак для слова. Используется
+        crc32, а не встроенная hash(), значение которой для строк
+        меняется между запусками интерпретатора
+        :param word: слово
+        :return: кортеж (номер столбца, знак +1 или -1)
+        """
+        word_hash = zlib.crc32(word.encode('utf-8'))
+        if self.alternate_sign and word_hash >> 31:
+            return word_hash % self.n_features, -1
+        return word_hash % self.n_features, 1
+
 
 class TfidfTransformer:
     """
     Инициализатор класса TfidfTransformer
+    engine - способ вычислений: 'python' (по умолчанию) или 'numpy'
+             (векторизованные вычисления, требуется пакет numpy)
+    idf - список idf-значений слов, найденный при обучении
+    document_frequency - список, i-й элемент которого - число
+                         документов, содержащих i-е слово
+    n_documents - число документов, по которым найдены idf-значения
+    count_matrix - терм-документная матрица, по которой получена
+                   tfidf_matrix (нужна update для пересчета строк)
     tfidf_matrix - матрица с рассчитанными значениями tfidf
+    instrumentation - если задан объект Instrumentation, в него
+                      собирается время этапов idf, idf_update, tf и tfidf
     """
 
-    def __init__(self):
+    def __init__(self, engine: str = 'python', instrumentation: Instrumentation = None):
+        if engine not in ('python', 'numpy'):
+            raise ValueError("engine должен быть 'python' или 'numpy', получено {!r}".format(engine))
+        if engine == 'numpy' and np is None:
+            raise ImportError("Для engine='numpy' требуется пакет numpy")
+        self.engine = engine
+        self.instrumentation = instrumentation
+        self.idf = []
+        self.document_frequency = []
+        self.n_documents = 0
+        self.count_matrix = []
         self.tfidf_matrix = []
 
+    def fit(self, count_matrix: list[list[int]]) -> 'TfidfTransformer':
+        """
+        Функция вычисляет и запоминает idf-значения слов по
+        терм-документной матрице. Матрицы, найденные при прошлом
+        обучении, сбрасываются
+        :param count_matrix: терм-документная матрица, которая была
+                             создана из корпуса с помощью класса
+                             CountVectorizer
+        :return: возвращается сам объект TfidfTransformer
+        """
+        with self.__stage('idf'):
+            if self.engine == 'numpy':
+                document_frequency, number_of_docs = self.__numpy_document_frequency(count_matrix)
+            else:
+                document_frequency, number_of_docs = self.__document_frequency(count_matrix)
+            self.__set_document_frequency(document_frequency, number_of_docs)
+        return self
+
+    def fit_document_frequency(self, document_frequency: list[int],
+                               number_of_docs: int) -> 'TfidfTransformer':
+        """
+        Функция вычисляет и запоминает idf-значения слов по уже
+        подсчитанным документным частотам (например, собранным
+        CountVectorizer.fit), не требуя терм-документной матрицы
+        :param document_frequency: список, i-й элемент которого - число
+                                   документов, содержащих i-е слово
+        :param number_of_docs: число документов в корпусе
+        :return: возвращается сам объект TfidfTransformer
+        """
+        with self.__stage('idf'):
+            self.__set_document_frequency(list(document_frequency), number_of_docs)
+        return self
+
+    def refresh_document_frequency(self, document_frequency: list[int],
+                                   number_of_docs: int) -> 'TfidfTransformer':
+        """
+        Функция пересчитывает idf-значения по дополненным документным
+        частотам (например, после CountVectorizer.partial_fit), сохраняя
+        count_matrix и tfidf_matrix: их строки остаются прежними, а
+        новые слова должны быть последними столбцами
+        :param document_frequency: список, i-й элемент которого - число
+                                   документов, содержащих i-е слово
+        :param number_of_docs: число документов в корпусе
+        :return: возвращается сам объект TfidfTransformer
+        """
+        if len(document_frequency) < len(self.document_frequency):
+            raise ValueError('Число слов ({}) меньше числа слов при обучении ({})'
+                             .format(len(document_frequency), len(self.document_frequency)))
+        with self.__stage('idf'):
+            self.__set_document_frequency(list(document_frequency), number_of_docs,
+                                          keep_matrices=True)
+        return self
+
+    def update(self, new_counts, reweight: str = 'none'):
+        """
+        Функция дообучает TfidfTransformer на новых документах: их
+        документные частоты прибавляются к сохраненным, и idf-значения
+        пересчитываются по частотам без повторного просмотра
+        count_matrix. Строки новых документов дописываются в count_matrix
+        и tfidf_matrix. Если словарь вырос, новые слова должны быть
+        последними столбцами new_counts
+        :param new_counts: терм-документная матрица новых документов
+                           (того же формата, что и при обучении)
+        :param reweight: какие строки tfidf_matrix пересчитать с новыми
+                         idf-значениями:
+                         'none' - никакие (по умолчанию),
+                         'affected' - строки, содержащие слова новых
+                                      документов; у остальных строк idf
+                                      меняется только из-за роста числа
+                                      документов и не пересчитывается,
+                         'all' - все строки, результат совпадает с
+                                 fit_transform по count_matrix вместе
+                                 с новыми строками
+        :return: возвращается tfidf-матрица новых документов
+        """
+        if reweight not in ('none', 'affected', 'all'):
+            raise ValueError("reweight должен быть 'none', 'affected' или 'all', "
+                             "получено {!r}".format(reweight))
+        with self.__stage('idf_update') as record:
+            if self.engine == 'numpy':
+                new_frequency, number_of_docs = self.__numpy_document_frequency(new_counts)
+            else:
+                new_frequency, number_of_docs = self.__document_frequency(new_counts)
+            if len(new_frequency) < len(self.document_frequency):
+                raise ValueError('Число столбцов матрицы ({}) меньше числа слов при обучении '
+                                 '({})'.format(len(new_frequency), len(self.document_frequency)))
+            self.document_frequency.extend([0] * (len(new_frequency) - len(self.document_frequency)))
+            changed_columns = []
+            for column, frequency in enumerate(new_frequency):
+                if frequency:
+                    self.document_frequency[column] += frequency
+                    changed_columns.append(column)
+            self.n_documents += number_of_docs
+            self.idf = self.__idf_from_frequency(self.document_frequency, self.n_documents)
+            if record is not None:
+                record.documents = number_of_docs
+        new_tfidf = self.transform(new_counts)
+        n_old_documents = len(self.count_matrix)
+        self.count_matrix = _stack_rows(self.count_matrix, new_counts, len(self.idf), 'q')
+        if reweight == 'all':
+            self.tfidf_matrix = self.transform(self.count_matrix)
+            return new_tfidf
+        self.tfidf_matrix = _stack_rows(self.tfidf_matrix, new_tfidf, len(self.idf), 'd')
+        if reweight == 'affected' and n_old_documents:
+            rows = _rows_with_columns(self.count_matrix, changed_columns, n_old_documents)
+            if rows:
+                _put_rows(self.tfidf_matrix, rows,
+                          self.transform(_take_rows(self.count_matrix, rows)))
+        return new_tfidf
+
+    def transform(self, count_matrix: list[list[int]]) -> list[list[float]]:
+        """
+        Функция получает tfidf-матрицу, используя idf-значения,
+        найденные при обучении
+        :param count_matrix: терм-документная матрица (список списков
+                             или CsrMatrix), столбцы которой соответствуют
+                             словам, на которых обучался TfidfTransformer
+        :return: возвращается tfidf-матрица того же формата, что и
+                 count_matrix (для engine='numpy' - numpy.ndarray или
+                 CsrMatrix на основе numpy)
+        """
+        with self.__stage('tfidf') as record:
+            if self.engine == 'numpy':
+                tfidf_matrix = self.__numpy_transform(count_matrix)
+            elif isinstance(count_matrix, CsrMatrix):
+                self.__check_number_of_features(count_matrix.shape[1])
+                tfidf_matrix = self.__sparse_transform(count_matrix)
+            else:
+                tfidf_matrix = self.__dense_transform(count_matrix)
+            _record_matrix(record, tfidf_matrix)
+        return tfidf_matrix
+
+    def __dense_transform(self, count_matrix: list[list[int]]) -> list[list[float]]:
+        """
+        Функция получает tfidf-матрицу из плотной терм-документной матрицы
+        :param count_matrix: терм-документная матрица (список списков)
+        :return: возвращается tfidf-матрица (список списков)
+        """
+        number_of_feature_names = len(self.idf)
+        with self.__stage('tf'):
+            tf_matrix = self.__tf_transform(count_matrix)
+        tfidf_matrix = []
+        for tf_doc in tf_matrix:
+            self.__check_number_of_features(len(tf_doc))
+            tfidf_doc = [0.0] * number_of_feature_names
+            for j in range(number_of_feature_names):
+                tfidf_doc[j] = round(tf_doc[j] * self.idf[j], 3)
+            tfidf_matrix.append(tfidf_doc)
+        return tfidf_matrix
+
     def fit_transform(self, count_matrix: list[list[int]]) -> list[list[float]]:
         """
         Функция получает tfidf-матрицу из терм-документной матрицы, полученной
@@ -89,52 +720,177 @@ class TfidfTransformer:
                              CountVectorizer
         :return: возвращается tfidf-матрица
         """
-        tf_matrix = self.__tf_transform(count_matrix)
-        idf_matrix = self.__idf_transform(count_matrix)
-        number_of_docs = len(count_matrix)
-        number_of_feature_names = len(count_matrix[0])
-        for i in range(number_of_docs):
-            tfidf_doc = [0.0] * number_of_feature_names
-            for j in range(number_of_feature_names):
-                tfidf_doc[j] = round(tf_matrix[i][j] * idf_matrix[j], 3)
-            self.tfidf_matrix.append(tfidf_doc)
+        self.fit(count_matrix)
+        self.count_matrix = count_matrix
+        self.tfidf_matrix = self.transform(count_matrix)
         return self.tfidf_matrix
 
+    def __set_document_frequency(self, document_frequency: list[int], number_of_docs: int,
+                                 keep_matrices: bool = False):
+        """
+        Функция запоминает документные частоты, вычисляет по ним
+        idf-значения и сбрасывает матрицы прошлого обучения
+        :param document_frequency: список документных частот слов
+        :param number_of_docs: число документов
+        :param keep_matrices: если True, матрицы не сбрасываются
+        :return: функция ничего не возвращает
+        """
+        self.document_frequency = document_frequency
+        self.n_documents = number_of_docs
+        self.idf = self.__idf_from_frequency(document_frequency, number_of_docs)
+        if not keep_matrices:
+            self.count_matrix = []
+            self.tfidf_matrix = []
+
+    def __stage(self, name: str):
+        """
+        Функция возвращает контекстный менеджер, измеряющий этап,
+        или пустой контекстный менеджер, если instrumentation не задан
+        :param name: имя этапа
+        :return: контекстный менеджер, возвращающий StageStats или None
+        """
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.stage(name)
+
+    def __check_number_of_features(self, number_of_feature_names: int):
+        """
+        Функция проверяет, что число столбцов матрицы совпадает
+        с числом слов, на которых обучался TfidfTransformer
+        :param number_of_feature_names: число столбцов матрицы
+        :return: функция ничего не возвращает
+        """
+        if number_of_feature_names != len(self.idf):
+            raise ValueError('Число столбцов матрицы ({}) не совпадает с числом '
+                             'слов при обучении ({})'.format(number_of_feature_names, len(self.idf)))
+
     def __tf_transform(self, count_matrix: list[list[int]]) -> list[list[float]]:
         """
         Функция подсчитывает значение term frequency, используя
-        терм-документную матрицу
+        терм-документную матрицу. Длина документа считается как сумма
+        модулей значений (для матрицы HashingVectorizer со знаками).
+        Для документа без единого слова из словаря все значения равны нулю
         :param count_matrix: терм-документная матрица, которая была
                              создана из корпуса с помощью класса
                              CountVectorizer
         :return: возвращается матрица с tf-значениями
         """
         tf_matrix = []
-        number_of_feature_names = len(count_matrix[0])
         for doc in count_matrix:
+            number_of_feature_names = len(doc)
             tf_doc = [0.0] * number_of_feature_names
-            number_of_words_in_doc = sum(doc)
-            for i in range(number_of_feature_names):
-                tf_doc[i] = doc[i] / number_of_words_in_doc
+            number_of_words_in_doc = sum(map(abs, doc))
+            if number_of_words_in_doc:
+                for i in range(number_of_feature_names):
+                    tf_doc[i] = doc[i] / number_of_words_in_doc
             tf_matrix.append(tf_doc)
         return tf_matrix
 
-    def __idf_transform(self, count_matrix: list[list[int]]) -> list[float]:
+    def __sparse_transform(self, count_matrix: CsrMatrix) -> CsrMatrix:
+        """
+        Функция получает tfidf-матрицу из разреженной терм-документной
+        матрицы. Обрабатываются только ненулевые элементы, массивы
+        indptr и indices переиспользуются без копирования
+        :param count_matrix: терм-документная матрица CsrMatrix
+        :return: возвращается tfidf-матрица CsrMatrix
+        """
+        indptr, indices, data = count_matrix.indptr, count_matrix.indices, count_matrix.data
+        tfidf_data = array('d')
+        for i in range(count_matrix.shape[0]):
+            start, end = indptr[i], indptr[i + 1]
+            number_of_words_in_doc = 0
+            for j in range(start, end):
+                number_of_words_in_doc += abs(data[j])
+            for j in range(start, end):
+                tf = data[j] / number_of_words_in_doc if number_of_words_in_doc else 0.0
+                tfidf_data.append(round(tf * self.idf[indices[j]], 3))
+        return CsrMatrix(indptr, indices, tfidf_data, count_matrix.shape)
+
+    def __numpy_transform(self, count_matrix):
+        """
+        Функция получает tfidf-матрицу векторизованно: длины документов
+        находятся суммированием по строкам, tf и idf перемножаются
+        с broadcasting. Результат совпадает с вычислениями на Python
+        :param count_matrix: терм-документная матрица (список списков,
+                             numpy.ndarray или CsrMatrix)
+        :return: возвращается tfidf-матрица numpy.ndarray или CsrMatrix
+        """
+        idf = np.asarray(self.idf, dtype=np.float64)
+        if isinstance(count_matrix, CsrMatrix):
+            self.__check_number_of_features(count_matrix.shape[1])
+            indptr = np.asarray(count_matrix.indptr)
+            indices = np.asarray(count_matrix.indices)
+            data = np.asarray(count_matrix.data)
+            rows = np.repeat(np.arange(count_matrix.shape[0]), np.diff(indptr))
+            lengths = np.bincount(rows, weights=np.abs(data), minlength=count_matrix.shape[0])[rows]
+            tf = np.divide(data, lengths, out=np.zeros(len(data)), where=lengths != 0)
+            tfidf_data = _round_like_python(tf * idf[indices], 3)
+            return CsrMatrix(indptr, indices, tfidf_data, count_matrix.shape)
+        counts = np.asarray(count_matrix, dtype=np.float64)
+        if counts.ndim != 2:
+            counts = counts.reshape(len(counts), -1)
+        self.__check_number_of_features(counts.shape[1])
+        lengths = np.abs(counts).sum(axis=1, keepdims=True)
+        tf = np.divide(counts, lengths, out=np.zeros_like(counts), where=lengths != 0)
+        return _round_like_python(tf * idf, 3)
+
+    def __numpy_document_frequency(self, count_matrix) -> tuple[list[int], int]:
         """
-        Функция подсчитывает значение inverse document-frequency, используя
-        терм-документную матрицу
+        Функция подсчитывает документные частоты векторизованно:
+        ненулевые элементы считаются по столбцам
+        :param count_matrix: терм-документная матрица (список списков,
+                             numpy.ndarray или CsrMatrix)
+        :return: кортеж (список документных частот слов, число документов)
+        """
+        if isinstance(count_matrix, CsrMatrix):
+            indices = np.asarray(count_matrix.indices)
+            data = np.asarray(count_matrix.data)
+            docs_with_word = np.bincount(indices[data != 0], minlength=count_matrix.shape[1])
+            number_of_docs = count_matrix.shape[0]
+        else:
+            counts = np.asarray(count_matrix)
+            if counts.ndim != 2:
+                counts = counts.reshape(len(counts), -1)
+            docs_with_word = np.count_nonzero(counts, axis=0)
+            number_of_docs = counts.shape[0]
+        # логарифм считается через math.log в __idf_from_frequency,
+        # чтобы idf-значения совпадали побитово
+        return docs_with_word.tolist(), number_of_docs
+
+    @staticmethod
+    def __document_frequency(count_matrix: list[list[int]]) -> tuple[list[int], int]:
+        """
+        Функция подсчитывает, в скольких документах встречается каждое
+        слово, используя терм-документную матрицу
         :param count_matrix: терм-документная матрица, которая была
                              создана из корпуса с помощью класса
-                             CountVectorizer
-        :return: возвращается матрица с idf-значениями
+                             CountVectorizer (список списков или CsrMatrix)
+        :return: кортеж (список документных частот слов, число документов)
         """
+        if isinstance(count_matrix, CsrMatrix):
+            docs_with_word = [0] * count_matrix.shape[1]
+            for i in range(count_matrix.nnz):
+                if count_matrix.data[i] != 0:
+                    docs_with_word[count_matrix.indices[i]] += 1
+            return docs_with_word, count_matrix.shape[0]
         number_of_docs = len(count_matrix)
-        number_of_feature_names = len(count_matrix[0])
+        number_of_feature_names = len(count_matrix[0]) if number_of_docs else 0
         docs_with_word = [0] * number_of_feature_names
         for doc in count_matrix:
             for i in range(number_of_feature_names):
                 if doc[i] != 0:
                     docs_with_word[i] += 1
+        return docs_with_word, number_of_docs
+
+    @staticmethod
+    def __idf_from_frequency(docs_with_word: list[int], number_of_docs: int) -> list[float]:
+        """
+        Функция подсчитывает значение inverse document-frequency по
+        числу документов, в которых встречается каждое слово
+        :param docs_with_word: список документных частот слов
+        :param number_of_docs: число документов в корпусе
+        :return: возвращается матрица с idf-значениями
+        """
         idf_matrix = []
         for elem in docs_with_word:
             idf_matrix.append(math.log((number_of_docs + 1) / (elem + 1)) + 1)
@@ -143,16 +899,118 @@ class TfidfTransformer:
 
 class TfidfVectorizer(CountVectorizer):
 
-    def __init__(self):
+    def __init__(self, sparse: bool = False, n_jobs: int = 1, analyzer: Analyzer = None,
+                 min_df=1, max_df=1.0, max_features: int = None, engine: str = 'python',
+                 instrumentation: Instrumentation = None):
         """
         Инициализатор класса TfidfVectorizer
+        sparse - если True, терм-документная и tfidf-матрицы
+                 возвращаются в разреженном формате CsrMatrix
+        n_jobs, analyzer, min_df, max_df, max_features - параметры
+                 разбора и отбора слов (см. CountVectorizer)
+        engine - способ расчета tfidf: 'python' (по умолчанию) или
+                 'numpy' (см. TfidfTransformer)
+        instrumentation - объект Instrumentation, общий для этапов
+                          подсчета слов и расчета tfidf
         tfidf_matrix - матрица с рассчитанными значениями tfidf
         transformer - экземпляр класса TfidfTransformer, предназначен
                       для получения tfidf-матрицы
         """
-        super().__init__()
+        super().__init__(sparse=sparse, n_jobs=n_jobs, analyzer=analyzer, min_df=min_df,
+                         max_df=max_df, max_features=max_features,
+                         instrumentation=instrumentation)
         self.tfidf_matrix = []
-        self.transformer = TfidfTransformer()
+        self.transformer = TfidfTransformer(engine, instrumentation)
+
+    def fit(self, corpus: Iterable[str]) -> 'TfidfVectorizer':
+        """
+        Функция находит словарь корпуса и idf-значения оставшихся
+        после отбора слов за один проход по корпусу
+        :param corpus: итерируемый объект с предложениями
+        :return: возвращается сам объект TfidfVectorizer
+        """
+        super().fit(corpus)
+        self.tfidf_matrix = []
+        self.transformer.fit_document_frequency(self.document_frequency, self.n_documents)
+        return self
+
+    def partial_fit(self, batch: Iterable[str]) -> 'TfidfVectorizer':
+        """
+        Функция дополняет словарь документами из batch и
+        пересчитывает idf-значения слов. Найденные count_matrix и
+        tfidf_matrix сохраняются (строки для документов batch в них
+        не добавляются, для этого служит update)
+        :param batch: итерируемый объект с предложениями
+        :return: возвращается сам объект TfidfVectorizer
+        """
+        super().partial_fit(batch)
+        self.transformer.refresh_document_frequency(self.document_frequency, self.n_documents)
+        return self
+
+    def update(self, batch: Iterable[str], reweight: str = 'none') -> list[list[float]]:
+        """
+        Функция дообучает TfidfVectorizer на новых документах: словарь
+        и документные частоты дополняются (новые слова становятся
+        последними столбцами), idf-значения пересчитываются по частотам,
+        а строки новых документов дописываются в count_matrix и
+        tfidf_matrix (см. TfidfTransformer.update). Отбор слов по
+        min_df, max_df и max_features не выполняется, а уже отброшенные
+        слова (pruned_terms) пропускаются, поэтому при их отборе
+        reweight='all' совпадает с обучением на всех документах только
+        по оставшимся словам
+        :param batch: итерируемый объект с новыми предложениями
+        :param reweight: 'none', 'affected' или 'all' - какие из уже
+                         найденных строк tfidf_matrix пересчитать
+        :return: возвращается tfidf-матрица новых документов
+        """
+        batch = list(batch)
+        super().partial_fit(batch)
+        new_tfidf = self.transformer.update(super().transform(batch), reweight)
+        self.count_matrix = self.transformer.count_matrix
+        self.tfidf_matrix = self.transformer.tfidf_matrix
+        return new_tfidf
+
+    def transform(self, corpus: Iterable[str]) -> list[list[float]]:
+        """
+        Функция строит tfidf-матрицу по словарю и idf-значениям,
+        найденным при обучении, без повторного обучения.
+        Слова, которых нет в словаре, пропускаются
+        :param corpus: итерируемый объект с предложениями
+        :return: возвращается tfidf-матрица
+        """
+        return self.transformer.transform(super().transform(corpus))
+
+    def _binary_state(self) -> tuple[dict, dict]:
+        """
+        Функция дополняет сохраняемое состояние idf-значениями
+        и tfidf-матрицей
+        :return: кортеж (заголовок, словарь {имя: (typecode, массив)})
+        """
+        header, arrays = super()._binary_state()
+        header['engine'] = self.transformer.engine
+        arrays['idf'] = ('d', self.transformer.idf)
+        _add_matrix(header, arrays, 'tfidf_matrix', self.tfidf_matrix, 'd')
+        return header, arrays
+
+    def _load_binary_state(self, header: dict, arrays: dict):
+        """
+        Функция восстанавливает состояние объекта, включая idf-значения
+        :param header: заголовок файла
+        :param arrays: словарь {имя: массив}
+        :return: функция ничего не возвращает
+        """
+        super()._load_binary_state(header, arrays)
+        self.transformer = TfidfTransformer(header['engine'], self.instrumentation)
+        self.transformer.idf = arrays['idf']
+        self.transformer.document_frequency = list(self.document_frequency)
+        self.transformer.n_documents = self.n_documents
+        self.tfidf_matrix = _read_matrix(header, arrays, 'tfidf_matrix')
+        if self.transformer.engine == 'numpy' and isinstance(self.tfidf_matrix, list) \
+                and self.tfidf_matrix:
+            # плотная матрица engine='numpy' сохранялась как numpy.ndarray
+            self.tfidf_matrix = np.asarray(self.tfidf_matrix, dtype=np.float64)
+        self.transformer.count_matrix = self.count_matrix
+        self.transformer.tfidf_matrix = self.tfidf_matrix
 
     def fit_transform(self, corpus: list[str]) -> list[list[float]]:
         """
@@ -168,6 +1026,207 @@ class TfidfVectorizer(CountVectorizer):
         return self.tfidf_matrix
 
 
+def _stack_rows(top, bottom, n_columns: int, typecode: str):
+    """
+    Функция дописывает строки матрицы bottom после строк матрицы top;
+    у top может быть меньше столбцов (недостающие заполняются нулями).
+    Элементы CsrMatrix копируются все, включая нулевые, чтобы строки
+    tfidf-матрицы совпадали по столбцам со строками терм-документной
+    :param top: матрица (CsrMatrix, numpy.ndarray или список списков)
+    :param bottom: матрица того же формата с n_columns столбцами
+    :param n_columns: число столбцов результата
+    :param typecode: тип элементов data для CsrMatrix (как в модуле array)
+    :return: матрица того же формата
+    """
+    if not len(top):
+        return bottom
+    if isinstance(top, CsrMatrix) or isinstance(bottom, CsrMatrix):
+        indptr, indices, data = array('q'), array('q'), array(typecode)
+        for matrix in (top, bottom):
+            if not isinstance(matrix, CsrMatrix):
+                matrix = CsrMatrix.from_dense(matrix, typecode)
+            offset = len(indices)
+            indptr.extend(offset + int(position) for position in matrix.indptr[:-1])
+            indices.extend(matrix.indices)
+            data.extend(matrix.data)
+        indptr.append(len(indices))
+        return CsrMatrix(indptr, indices, data, (len(indptr) - 1, n_columns))
+    if np is not None and (isinstance(top, np.ndarray) or isinstance(bottom, np.ndarray)):
+        top = np.asarray(top)
+        top = np.pad(top, ((0, 0), (0, n_columns - top.shape[1])))
+        return np.vstack((top, np.asarray(bottom, dtype=top.dtype)))
+    zero = 0.0 if typecode == 'd' else 0
+    return [row + [zero] * (n_columns - len(row)) if len(row) < n_columns else row
+            for row in top] + list(bottom)
+
+
+def _rows_with_columns(matrix, columns: list[int], n_rows: int) -> list[int]:
+    """
+    Функция находит среди первых n_rows строк матрицы строки, в которых
+    есть ненулевой элемент хотя бы в одном из столбцов columns
+    :param matrix: матрица (CsrMatrix, numpy.ndarray или список списков)
+    :param columns: номера столбцов
+    :param n_rows: число просматриваемых строк
+    :return: список номеров строк
+    """
+    if isinstance(matrix, CsrMatrix):
+        columns = set(columns)
+        indptr, indices = matrix.indptr, matrix.indices
+        return [i for i in range(n_rows)
+                if not columns.isdisjoint(indices[indptr[i]:indptr[i + 1]])]
+    if np is not None and isinstance(matrix, np.ndarray):
+        return np.flatnonzero(matrix[:n_rows][:, columns].any(axis=1)).tolist()
+    return [i for i in range(n_rows) if any(matrix[i][column] for column in columns)]
+
+
+def _take_rows(matrix, rows: list[int]):
+    """
+    Функция выбирает строки терм-документной матрицы
+    :param matrix: матрица (CsrMatrix, numpy.ndarray или список списков)
+    :param rows: номера строк
+    :return: матрица того же формата из выбранных строк
+    """
+    if isinstance(matrix, CsrMatrix):
+        indptr, indices, data = array('q', [0]), [], []
+        for i in rows:
+            row_indices, row_data = matrix.row(i)
+            indices.extend(row_indices)
+            data.extend(row_data)
+            indptr.append(len(indices))
+        return CsrMatrix(indptr, indices, data, (len(rows), matrix.shape[1]))
+    if np is not None and isinstance(matrix, np.ndarray):
+        return matrix[rows]
+    return [matrix[i] for i in rows]
+
+
+def _put_rows(matrix, rows: list[int], values):
+    """
+    Функция заменяет строки матрицы. Для CsrMatrix строки values
+    должны содержать те же столбцы, что и заменяемые строки
+    :param matrix: изменяемая матрица (CsrMatrix, numpy.ndarray или
+                   список списков)
+    :param rows: номера заменяемых строк
+    :param values: матрица того же формата с новыми строками
+    :return: функция ничего не возвращает
+    """
+    if isinstance(matrix, CsrMatrix):
+        for row, i in enumerate(rows):
+            start = matrix.indptr[i]
+            values_start, values_end = values.indptr[row], values.indptr[row + 1]
+            for j in range(values_end - values_start):
+                matrix.data[start + j] = values.data[values_start + j]
+        return
+    for row, i in enumerate(rows):
+        matrix[i] = values[row]
+
+
+def _record_matrix(record, matrix):
+    """
+    Функция записывает в статистику этапа число строк и ненулевых
+    элементов полученной матрицы
+    :param record: статистика запуска этапа StageStats или None
+    :param matrix: CsrMatrix, numpy.ndarray или список списков
+    :return: функция ничего не возвращает
+    """
+    if record is None:
+        return
+    record.documents = len(matrix)
+    if isinstance(matrix, CsrMatrix):
+        record.nonzero = matrix.nnz
+    elif np is not None and isinstance(matrix, np.ndarray):
+        record.nonzero = int(np.count_nonzero(matrix))
+    else:
+        record.nonzero = sum(len(row) - row.count(0) for row in matrix)
+
+
+def _encode_terms(terms: Iterable[str]) -> tuple[array, bytes]:
+    """
+    Функция записывает слова подряд в кодировке utf-8
+    :param terms: итерируемый объект со словами
+    :return: кортеж (смещения начала слов с конечным смещением, байты слов)
+    """
+    encoded_terms = [term.encode('utf-8') for term in terms]
+    offsets = array('q', [0])
+    for term in encoded_terms:
+        offsets.append(offsets[-1] + len(term))
+    return offsets, b''.join(encoded_terms)
+
+
+def _decode_terms(offsets, encoded_terms) -> list[str]:
+    """
+    Функция восстанавливает слова, записанные функцией _encode_terms
+    :param offsets: смещения начала слов с конечным смещением
+    :param encoded_terms: байты слов
+    :return: список слов
+    """
+    encoded_terms = bytes(encoded_terms)
+    return [encoded_terms[offsets[i]:offsets[i + 1]].decode('utf-8')
+            for i in range(len(offsets) - 1)]
+
+
+def _add_matrix(header: dict, arrays: dict, name: str, matrix, typecode: str):
+    """
+    Функция добавляет матрицу к сохраняемым массивам. Плотная матрица
+    сохраняется в разреженном формате, в заголовке отмечается ее вид
+    :param header: заголовок файла
+    :param arrays: словарь {имя: (typecode, массив)}
+    :param name: имя матрицы
+    :param matrix: список списков или CsrMatrix (пустой список
+                   не сохраняется)
+    :param typecode: тип элементов матрицы (как в модуле array)
+    :return: функция ничего не возвращает
+    """
+    if isinstance(matrix, CsrMatrix):
+        sparse = True
+    elif len(matrix):
+        sparse = False
+        matrix = CsrMatrix.from_dense(matrix, typecode)
+    else:
+        return
+    header['matrices'][name] = {'shape': list(matrix.shape), 'sparse': sparse}
+    arrays[name + '.indptr'] = ('q', matrix.indptr)
+    arrays[name + '.indices'] = ('q', matrix.indices)
+    arrays[name + '.data'] = (typecode, matrix.data)
+
+
+def _read_matrix(header: dict, arrays: dict, name: str):
+    """
+    Функция восстанавливает матрицу, сохраненную _add_matrix
+    :param header: заголовок файла
+    :param arrays: словарь {имя: массив}
+    :param name: имя матрицы
+    :return: CsrMatrix, список списков или пустой список
+    """
+    if name not in header['matrices']:
+        return []
+    description = header['matrices'][name]
+    matrix = CsrMatrix(arrays[name + '.indptr'], arrays[name + '.indices'],
+                       arrays[name + '.data'], tuple(description['shape']))
+    return matrix if description['sparse'] else matrix.toarray()
+
+
+def _round_like_python(values, ndigits: int):
+    """
+    Функция округляет массив numpy так же, как встроенная round().
+    numpy.round умножает на 10 ** ndigits и может ошибиться рядом с
+    половиной, поэтому такие элементы пересчитываются через round()
+    :param values: массив numpy.ndarray
+    :param ndigits: число знаков после запятой
+    :return: округленный массив numpy.ndarray
+    """
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.round(values, ndigits)
+    fraction = np.abs(scaled - np.floor(scaled) - 0.5)
+    ambiguous = np.flatnonzero(fraction < 1e-6)
+    if len(ambiguous):
+        flat = rounded.reshape(-1)
+        flat_values = values.reshape(-1)
+        for i in ambiguous.tolist():
+            flat[i] = round(float(flat_values[i]), ndigits)
+    return rounded
+
+
 def solution():
     """
     Функция, проверяющаяя корректность реализации
@@ -180,6 +1239,9 @@ def solution():
     ]
     vectorizer = TfidfVectorizer()
     print(vectorizer.fit_transform(corpus))
+    print(vectorizer.transform(['Pasta with fresh Parmesan']))
+    hashed_matrix = HashingVectorizer(n_features=16).fit_transform(corpus)
+    print(TfidfTransformer().fit_transform(hashed_matrix).toarray())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,401 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import HW_2_Employees
+import HW_3_CountVectorizer
+import HW_4_TfIdfVectorizer
+import morse
+from one_hot_encoder import OneHotEncoder
+from tfidf_search import TfidfIndex
+
+RESULTS_PATH = 'benchmark_results.json'
+THRESHOLD = 0.1
+DEPARTMENTS = {
+    'Бухгалтерия': ['Расчет', 'Отчетность'],
+    'Продажи': ['B2B', 'B2C', 'Маркетинг'],
+    'Разработка': ['Бэкенд', 'Фронтенд', 'Мобильная', 'Инфраструктура'],
+    'Поддержка': ['Первая линия', 'Вторая линия'],
+}
+POSITIONS = ['Junior', 'Middle', 'Senior', 'Lead']
+
+
+def zipf_corpus(n_documents: int, vocabulary_size: int, words_per_document: int = 20,
+                exponent: float = 1.1, seed: int = 0) -> list[str]:
+    """
+    Функция создает корпус, в котором частоты слов подчиняются закону
+    Ципфа: слово ранга r встречается пропорционально 1 / r ** exponent
+    :param n_documents: число предложений
+    :param vocabulary_size: число различных слов, из которых выбираются слова
+    :param words_per_document: число слов в предложении
+    :param exponent: показатель закона Ципфа
+    :param seed: начальное значение генератора случайных чисел
+    :return: список предложений
+    """
+    generator = random.Random(seed)
+    words = ['w{}'.format(rank) for rank in range(1, vocabulary_size + 1)]
+    cum_weights = list(accumulate(rank ** -exponent for rank in range(1, vocabulary_size + 1)))
+    sample = generator.choices(words, cum_weights=cum_weights, k=n_documents * words_per_document)
+    return [' '.join(sample[i:i + words_per_document])
+            for i in range(0, len(sample), words_per_document)]
+
+
+def write_employees(path: str, n_rows: int, seed: int = 0):
+    """
+    Функция записывает файл с работниками в формате Corp_Summary.csv
+    :param path: путь к файлу
+    :param n_rows: число работников
+    :param seed: начальное значение генератора случайных чисел
+    :return: функция ничего не возвращает
+    """
+    generator = random.Random(seed)
+    departments = list(DEPARTMENTS)
+    with open(path, 'w', buffering=1 << 20) as file:
+        file.write('ФИО полностью;Департамент;Отдел;Должность;Оценка;Оклад\n')
+        for i in range(n_rows):
+            department = generator.choice(departments)
+            file.write('Сотрудник {};{};{};{};{};{}\n'.format(
+                i, department, generator.choice(DEPARTMENTS[department]),
+                generator.choice(POSITIONS), generator.randint(6, 10) / 2,
+                generator.randrange(40000, 300000, 1000)))
+
+
+def morse_messages(n_messages: int, length: int = 30, seed: int = 0) -> list[str]:
+    """
+    Функция создает сообщения из символов азбуки Морзе
+    :param n_messages: число сообщений
+    :param length: длина сообщения
+    :param seed: начальное значение генератора случайных чисел
+    :return: список сообщений
+    """
+    generator = random.Random(seed)
+    alphabet = sorted(morse.LETTER_TO_MORSE.keys() - {', '})
+    return [''.join(generator.choices(alphabet, k=length)) for _ in range(n_messages)]
+
+
+def categories(n_rows: int, n_categories: int, seed: int = 0) -> list[str]:
+    """
+    Функция создает категориальный столбец с распределением Ципфа
+    (как города или артикулы)
+    :param n_rows: число значений
+    :param n_categories: число различных категорий
+    :param seed: начальное значение генератора случайных чисел
+    :return: список категорий
+    """
+    generator = random.Random(seed)
+    values = ['c{}'.format(rank) for rank in range(1, n_categories + 1)]
+    cum_weights = list(accumulate(1 / rank for rank in range(1, n_categories + 1)))
+    return generator.choices(values, cum_weights=cum_weights, k=n_rows)
+
+
+def _count_fit_transform(scale: float, workdir: str):
+    corpus = zipf_corpus(int(20000 * scale), 50000)
+    vectorizer = HW_3_CountVectorizer.CountVectorizer(sparse=True)
+    return lambda: vectorizer.fit_transform(corpus), len(corpus)
+
+
+def _count_transform(scale: float, workdir: str):
+    corpus = zipf_corpus(int(20000 * scale), 50000)
+    vectorizer = HW_3_CountVectorizer.CountVectorizer(sparse=True).fit(corpus)
+    return lambda: vectorizer.transform(corpus), len(corpus)
+
+
+def _hashing_transform(scale: float, workdir: str):
+    corpus = zipf_corpus(int(20000 * scale), 50000)
+    vectorizer = HW_4_TfIdfVectorizer.HashingVectorizer()
+    return lambda: vectorizer.transform(corpus), len(corpus)
+
+
+def _tfidf_transformer(engine: str):
+    def setup(scale: float, workdir: str):
+        corpus = zipf_corpus(int(20000 * scale), 50000)
+        count_matrix = HW_3_CountVectorizer.CountVectorizer(sparse=True).fit_transform(corpus)
+        transformer = HW_4_TfIdfVectorizer.TfidfTransformer(engine)
+        return lambda: transformer.fit_transform(count_matrix), len(corpus)
+    return setup
+
+
+def _tfidf_vectorizer(scale: float, workdir: str):
+    # TfidfVectorizer возвращает плотную матрицу, поэтому корпус меньше
+    corpus = zipf_corpus(int(1000 * scale), 2000)
+    return lambda: HW_4_TfIdfVectorizer.TfidfVectorizer().fit_transform(corpus), len(corpus)
+
+
+def _tfidf_index(engine: str):
+    def setup(scale: float, workdir: str):
+        corpus = zipf_corpus(int(20000 * scale), 50000)
+        vectorizer = HW_4_TfIdfVectorizer.TfidfVectorizer(sparse=True)
+        tfidf_matrix = vectorizer.fit_transform(corpus)
+        index = TfidfIndex(vectorizer, engine).fit(tfidf_matrix)
+        queries = zipf_corpus(200, 50000, words_per_document=3, seed=1)
+        return lambda: index.most_similar_many(queries), len(queries)
+    return setup
+
+
+def _employees(path_name: str, operation):
+    def setup(scale: float, workdir: str):
+        n_rows = int(100000 * scale)
+        path = os.path.join(workdir, '{}_{}.csv'.format(path_name, n_rows))
+        if not os.path.exists(path):
+            write_employees(path, n_rows)
+        return lambda: operation(path), n_rows
+    return setup
+
+
+def _morse(operation):
+    def setup(scale: float, workdir: str):
+        messages = morse_messages(int(50000 * scale))
+        if operation is morse.decode_many:
+            messages = morse.encode_many(messages)
+        elif operation is morse.unpack_many:
+            messages = morse.pack_many(messages)
+            return lambda: operation(messages), int(50000 * scale)
+        return lambda: operation(messages), len(messages)
+    return setup
+
+
+def _one_hot(output: str):
+    def setup(scale: float, workdir: str):
+        values = categories(int(1000000 * scale), 200000)
+        encoder = OneHotEncoder(output=output).fit(values)
+        return lambda: encoder.transform(values), len(values)
+    return setup
+
+
+BENCHMARKS = {
+    'count_vectorizer.fit_transform': _count_fit_transform,
+    'count_vectorizer.transform': _count_transform,
+    'hashing_vectorizer.transform': _hashing_transform,
+    'tfidf_transformer.python': _tfidf_transformer('python'),
+    'tfidf_transformer.numpy': _tfidf_transformer('numpy'),
+    'tfidf_vectorizer.fit_transform': _tfidf_vectorizer,
+    'tfidf_index.python': _tfidf_index('python'),
+    'tfidf_index.numpy': _tfidf_index('numpy'),
+    'employees.get_summary': _employees(
+        'employees', lambda path: HW_2_Employees.get_summary(HW_2_Employees.get_statistics(path))),
+    'employees.table_summary': _employees(
+        'employees', lambda path: HW_2_Employees.get_employee_table(path).summary()),
+    'employees.grouped_report': _employees(
+        'employees', lambda path: HW_2_Employees.get_grouped_report(['department', 'position'], path)),
+    'morse.encode_many': _morse(morse.encode_many),
+    'morse.decode_many': _morse(morse.decode_many),
+    'morse.pack_many': _morse(morse.pack_many),
+    'morse.unpack_many': _morse(morse.unpack_many),
+    'one_hot.transform_index': _one_hot('index'),
+    'one_hot.transform_sparse': _one_hot('sparse'),
+}
+
+
+def measure(name: str, scale: float = 1.0, repeat: int = 3, workdir: str = None) -> dict:
+    """
+    Функция измеряет одну операцию: данные готовятся заранее и в
+    измерения не входят. Время - лучшее из repeat запусков, память и
+    блоки - по отдельному запуску под tracemalloc
+    :param name: имя операции из BENCHMARKS
+    :param scale: множитель размеров данных
+    :param repeat: число запусков для измерения времени
+    :param workdir: каталог для файлов с данными
+    :return: словарь с результатами: seconds - время операции,
+             items_per_second - пропускная способность,
+             peak_rss_kb - пиковый размер резидентной памяти процесса,
+             rss_growth_kb - на сколько операция подняла этот пик,
+             peak_traced_bytes - пик памяти, выделенной за операцию,
+             allocated_blocks - число блоков памяти, оставшихся после
+             операции (вместе с ее результатом)
+    """
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        operation, n_items = BENCHMARKS[name](scale, workdir or temporary_directory)
+        rss_before = _peak_rss()
+        seconds = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = operation()
+            seconds = min(seconds, time.perf_counter() - start)
+            del result
+        peak_rss = _peak_rss()
+        tracemalloc.start()
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            result = operation()
+            _, peak_traced = tracemalloc.get_traced_memory()
+            difference = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+        finally:
+            tracemalloc.stop()
+        del result
+    return {
+        'items': n_items,
+        'seconds': seconds,
+        'items_per_second': n_items / seconds if seconds else None,
+        'peak_rss_kb': peak_rss,
+        'rss_growth_kb': peak_rss - rss_before if peak_rss is not None else None,
+        'peak_traced_bytes': peak_traced,
+        'allocated_blocks': sum(stat.count_diff for stat in difference if stat.count_diff > 0),
+    }
+
+
+def run(names: list = None, scale: float = 1.0, repeat: int = 3, isolate: bool = True) -> dict:
+    """
+    Функция выполняет набор измерений
+    :param names: имена операций (по умолчанию все, кроме недоступных
+                  без numpy)
+    :param scale: множитель размеров данных
+    :param repeat: число запусков для измерения времени
+    :param isolate: если True, каждая операция выполняется в отдельном
+                    процессе, чтобы пик памяти относился только к ней
+    :return: словарь с описанием окружения и результатами по операциям
+    """
+    if names is None:
+        names = [name for name in BENCHMARKS if np is not None or not name.endswith('.numpy')]
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    results[name] = executor.submit(measure, name, scale, repeat, workdir).result()
+            else:
+                results[name] = measure(name, scale, repeat, workdir)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__ if np is not None else None,
+        'scale': scale,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> list[tuple]:
+    """
+    Функция сравнивает два набора измерений. Регрессия - рост времени
+    или пика выделенной памяти больше чем в 1 + threshold раз
+    :param baseline: результаты run для исходной версии
+    :param current: результаты run для новой версии
+    :param threshold: допустимый относительный рост
+    :return: список регрессий (операция, показатель, было, стало, отношение)
+    """
+    if baseline.get('scale') != current.get('scale'):
+        raise ValueError('Результаты получены при разных scale: {} и {}'.format(
+            baseline.get('scale'), current.get('scale')))
+    regressions = []
+    for name, result in current['results'].items():
+        base_result = baseline['results'].get(name)
+        if base_result is None:
+            continue
+        for metric in ('seconds', 'peak_traced_bytes'):
+            old, new = base_result[metric], result[metric]
+            if old and new > old * (1 + threshold):
+                regressions.append((name, metric, old, new, new / old))
+    return regressions
+
+
+def print_results(report: dict):
+    """
+    Функция печатает результаты run в виде таблицы
+    :param report: результаты run
+    :return: функция ничего не возвращает
+    """
+    print('{:<34}{:>10}{:>14}{:>12}{:>14}{:>12}'.format(
+        'Операция', 'Время, с', 'Элементов/с', 'RSS, КБ', 'Выделено, Б', 'Блоков'))
+    for name, result in report['results'].items():
+        print('{:<34}{:>10.4f}{:>14.0f}{:>12}{:>14}{:>12}'.format(
+            name, result['seconds'], result['items_per_second'] or 0,
+            result['peak_rss_kb'] if result['peak_rss_kb'] is not None else '-',
+            result['peak_traced_bytes'], result['allocated_blocks']))
+
+
+def print_regressions(regressions: list[tuple]):
+    """
+    Функция печатает регрессии, найденные compare
+    :param regressions: результат compare
+    :return: функция ничего не возвращает
+    """
+    for name, metric, old, new, ratio in regressions:
+        print('Регрессия {}: {} {:.6g} -> {:.6g} (x{:.2f})'.format(name, metric, old, new, ratio))
+
+
+def main(argv: list = None) -> int:
+    """
+    Функция разбирает аргументы командной строки:
+    run - выполнить измерения, сохранить их в JSON и, если задан
+          --baseline, сравнить с сохраненными ранее
+    compare - сравнить два сохраненных файла
+    :param argv: аргументы (по умолчанию sys.argv[1:])
+    :return: код возврата: 1, если найдены регрессии, иначе 0
+    """
+    parser = argparse.ArgumentParser(description='Измерение производительности')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='выполнить измерения')
+    run_parser.add_argument('--scale', type=float, default=1.0, help='множитель размеров данных')
+    run_parser.add_argument('--repeat', type=int, default=3, help='число запусков для времени')
+    run_parser.add_argument('--only', action='append', help='шаблон имен операций (fnmatch)')
+    run_parser.add_argument('--output', default=RESULTS_PATH, help='файл для результатов')
+    run_parser.add_argument('--baseline', help='файл с результатами для сравнения')
+    run_parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                            help='допустимый относительный рост')
+    run_parser.add_argument('--no-isolate', action='store_true',
+                            help='выполнять операции в текущем процессе')
+    compare_parser = commands.add_parser('compare', help='сравнить два файла с результатами')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                                help='допустимый относительный рост')
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'compare':
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        with open(arguments.current) as file:
+            current = json.load(file)
+        regressions = compare(baseline, current, arguments.threshold)
+        print_regressions(regressions)
+        return 1 if regressions else 0
+
+    names = None
+    if arguments.only:
+        names = [name for name in BENCHMARKS
+                 if any(fnmatch.fnmatch(name, pattern) for pattern in arguments.only)]
+    report = run(names, arguments.scale, arguments.repeat, not arguments.no_isolate)
+    print_results(report)
+    with open(arguments.output, 'w') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            regressions = compare(json.load(file), report, arguments.threshold)
+        print_regressions(regressions)
+        return 1 if regressions else 0
+    return 0
+
+
+def _peak_rss():
+    """
+    Функция возвращает пиковый размер резидентной памяти процесса
+    :return: размер в КБ или None, если модуль resource недоступен
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b'OMDBIN\x00\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def write_arrays(path, header: dict, arrays: dict):
+    """
+    Функция записывает в файл заголовок и набор типизированных массивов.
+    Формат файла: сигнатура MAGIC, версия формата и длина заголовка,
+    заголовок в JSON, затем массивы подряд, каждый выровнен на 8 байт
+    :param path: путь к файлу или открытый двоичный файловый объект
+    :param header: словарь, сериализуемый в JSON
+    :param arrays: словарь {имя: (typecode, массив)}, typecode - тип
+                   элементов как в модуле array
+    :return: функция ничего не возвращает
+    """
+    layout = {}
+    buffers = []
+    offset = 0
+    for name, (typecode, values) in arrays.items():
+        buffer = _as_bytes(values, typecode)
+        layout[name] = [typecode, offset, len(buffer) // array(typecode).itemsize]
+        buffers.append(buffer)
+        offset = _align(offset + len(buffer))
+    header = dict(header, byteorder=sys.byteorder, arrays=layout)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+    if hasattr(path, 'write'):
+        _write_file(path, header_bytes, data_start, buffers)
+        return
+    with open(path, 'wb', buffering=1 << 20) as file:
+        _write_file(file, header_bytes, data_start, buffers)
+
+
+def read_arrays(path: str, use_mmap: bool = False) -> tuple[dict, dict]:
+    """
+    Функция читает файл, записанный write_arrays
+    :param path: путь к файлу
+    :param use_mmap: если True, файл отображается в память и массивы
+                     возвращаются как memoryview без копирования (один
+                     файл могут разделять несколько процессов), иначе
+                     читаются в array.array
+    :return: кортеж (заголовок, словарь {имя: массив})
+    """
+    with open(path, 'rb') as file:
+        if use_mmap:
+            buffer = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            buffer = memoryview(file.read())
+    magic, version, header_length = _PREAMBLE.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError('Файл {} не является сохраненной моделью'.format(path))
+    if version != FORMAT_VERSION:
+        raise ValueError('Неподдерживаемая версия формата: {} (ожидается {})'.format(
+            version, FORMAT_VERSION))
+    header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+    if header['byteorder'] != sys.byteorder:
+        raise ValueError('Файл записан с порядком байтов {}'.format(header['byteorder']))
+    data_start = _align(_PREAMBLE.size + header_length)
+    arrays = {}
+    for name, (typecode, offset, length) in header.pop('arrays').items():
+        start = data_start + offset
+        values = buffer[start:start + length * array(typecode).itemsize]
+        if use_mmap:
+            arrays[name] = values.cast(typecode)
+        else:
+            arrays[name] = array(typecode, values.tobytes())
+    return header, arrays
+
+
+def _write_file(file, header_bytes: bytes, data_start: int, buffers: list):
+    file.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+    file.write(header_bytes)
+    file.write(b'\x00' * (data_start - _PREAMBLE.size - len(header_bytes)))
+    for buffer in buffers:
+        file.write(buffer)
+        file.write(b'\x00' * (_align(len(buffer)) - len(buffer)))
+
+
+def _as_bytes(values, typecode: str):
+    if isinstance(values, (bytes, bytearray)) and typecode == 'B':
+        return values
+    if isinstance(values, array) and values.typecode == typecode:
+        return memoryview(values).cast('B')
+    if hasattr(values, 'astype'):
+        return values.astype(typecode).tobytes()
+    if isinstance(values, memoryview) and values.format == typecode:
+        return values.cast('B')
+    return memoryview(array(typecode, values)).cast('B')
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
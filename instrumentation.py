@@ -0,0 +1,213 @@
+import cProfile
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+
+class StageStats:
+    """
+    Статистика этапа обработки: время и число обработанных элементов.
+    Один объект описывает либо один запуск этапа, либо сумму запусков
+    """
+
+    def __init__(self, name: str):
+        """
+        Инициализатор класса StageStats
+        name - имя этапа
+        calls - число запусков этапа
+        seconds - время, проведенное в самом этапе (без вложенных этапов)
+        documents - число обработанных документов
+        tokens - число обработанных слов
+        nonzero - число ненулевых элементов в полученной матрице
+        """
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.documents = 0
+        self.tokens = 0
+        self.nonzero = 0
+
+    def add(self, other: 'StageStats'):
+        """
+        Функция добавляет статистику другого запуска этапа
+        :param other: объект StageStats
+        :return: функция ничего не возвращает
+        """
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.documents += other.documents
+        self.tokens += other.tokens
+        self.nonzero += other.nonzero
+
+    def as_dict(self) -> dict:
+        """
+        Функция возвращает статистику в виде словаря
+        :return: словарь {показатель: значение}
+        """
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'seconds': self.seconds,
+            'documents': self.documents,
+            'tokens': self.tokens,
+            'nonzero': self.nonzero,
+        }
+
+    def __repr__(self) -> str:
+        return 'StageStats({})'.format(', '.join(
+            '{}={!r}'.format(key, value) for key, value in self.as_dict().items()))
+
+
+class Instrumentation:
+    """
+    В файле приведена реализация класса Instrumentation, который
+    собирает статистику по этапам векторизации (разбор на слова,
+    построение словаря, подсчет слов, idf, tfidf). Этапы, вложенные
+    друг в друга (например, генераторы, читающие друг из друга за
+    один проход), учитываются раздельно: время относится к этапу,
+    который выполняется в данный момент
+    """
+
+    def __init__(self, callback: Callable[[StageStats], None] = None, profile: bool = False):
+        """
+        Инициализатор класса Instrumentation
+        callback - функция, которая вызывается по окончании каждого
+                   запуска этапа со статистикой этого запуска
+        profile - если True, каждый этап выполняется под своим
+                  профилировщиком cProfile (см. profile_stats)
+        stages - словарь {имя этапа: StageStats} с суммой всех запусков
+        vocabulary_size - размер словаря после последнего обучения
+        """
+        self.callback = callback
+        self.profile = profile
+        self.stages = {}
+        self.vocabulary_size = None
+        self.profiles = {}
+        self.__stack = []
+        self.__last_switch = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """
+        Функция измеряет этап, выполняемый внутри блока with
+        :param name: имя этапа
+        :return: статистика запуска, в которую можно добавить
+                 число документов, слов и ненулевых элементов
+        """
+        record = StageStats(name)
+        record.calls = 1
+        self.__enter(record)
+        try:
+            yield record
+        finally:
+            self.__exit()
+            self.__finish(record)
+
+    def iterate(self, name: str, iterable: Iterable, count_tokens: bool = False) -> Iterator:
+        """
+        Функция измеряет этап, который выдает элементы по одному: этапу
+        приписывается время получения каждого элемента из iterable
+        :param name: имя этапа
+        :param iterable: итерируемый объект (например, генератор)
+        :param count_tokens: если True, элементы - списки слов, и их
+                             длины суммируются в tokens
+        :return: генератор тех же элементов
+        """
+        record = StageStats(name)
+        record.calls = 1
+        iterator = iter(iterable)
+        try:
+            while True:
+                self.__enter(record)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.__exit()
+                record.documents += 1
+                if count_tokens:
+                    record.tokens += len(item)
+                yield item
+        finally:
+            self.__finish(record)
+
+    def reset(self):
+        """
+        Функция сбрасывает собранную статистику и профили
+        :return: функция ничего не возвращает
+        """
+        self.stages = {}
+        self.vocabulary_size = None
+        self.profiles = {}
+
+    def report(self) -> list[dict]:
+        """
+        Функция возвращает суммарную статистику по этапам
+        :return: список словарей в порядке первого запуска этапов
+        """
+        return [stats.as_dict() for stats in self.stages.values()]
+
+    def profile_stats(self, name: str, sort: str = 'cumulative') -> pstats.Stats:
+        """
+        Функция возвращает результаты профилирования этапа
+        :param name: имя этапа
+        :param sort: ключ сортировки pstats
+        :return: объект pstats.Stats
+        """
+        if name not in self.profiles:
+            raise KeyError('Этап {} не профилировался (profile=False или этап не запускался)'
+                           .format(name))
+        return pstats.Stats(self.profiles[name]).sort_stats(sort)
+
+    def __enter(self, record: StageStats):
+        """
+        Функция делает этап текущим; время с предыдущего переключения
+        относится к прерванному этапу
+        :param record: статистика запуска этапа
+        :return: функция ничего не возвращает
+        """
+        now = time.perf_counter()
+        if self.__stack:
+            self.__stack[-1].seconds += now - self.__last_switch
+            self.__pause_profile()
+        self.__stack.append(record)
+        self.__resume_profile()
+        self.__last_switch = time.perf_counter()
+
+    def __exit(self):
+        """
+        Функция завершает текущий этап и возобновляет прерванный
+        :return: функция ничего не возвращает
+        """
+        now = time.perf_counter()
+        self.__pause_profile()
+        self.__stack.pop().seconds += now - self.__last_switch
+        if self.__stack:
+            self.__resume_profile()
+        self.__last_switch = time.perf_counter()
+
+    def __finish(self, record: StageStats):
+        """
+        Функция добавляет статистику запуска к сумме по этапу
+        и передает ее в callback
+        :param record: статистика запуска этапа
+        :return: функция ничего не возвращает
+        """
+        if record.name not in self.stages:
+            self.stages[record.name] = StageStats(record.name)
+        self.stages[record.name].add(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def __pause_profile(self):
+        if self.profile:
+            self.profiles[self.__stack[-1].name].disable()
+
+    def __resume_profile(self):
+        if self.profile:
+            name = self.__stack[-1].name
+            if name not in self.profiles:
+                self.profiles[name] = cProfile.Profile()
+            self.profiles[name].enable()
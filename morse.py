@@ -0,0 +1,234 @@
+"""Morse Code Translator"""
+import re
+from typing import Iterable, Iterator
+
+LETTER_TO_MORSE = {
+    'A': '.-', 'B': '-...', 'C': '-.-.',
+    'D': '-..', 'E': '.', 'F': '..-.',
+    'G': '--.', 'H': '....', 'I': '..',
+    'J': '.---', 'K': '-.-', 'L': '.-..',
+    'M': '--', 'N': '-.', 'O': '---',
+    'P': '.--.', 'Q': '--.-', 'R': '.-.',
+    'S': '...', 'T': '-', 'U': '..-',
+    'V': '...-', 'W': '.--', 'X': '-..-',
+    'Y': '-.--', 'Z': '--..', '1': '.----',
+    '2': '..---', '3': '...--', '4': '....-',
+    '5': '.....', '6': '-....', '7': '--...',
+    '8': '---..', '9': '----.', '0': '-----',
+    ', ': '--..--', '.': '.-.-.-', '?': '..--..',
+    '/': '-..-.', '-': '-....-', '(': '-.--.', ')': '-.--.-',
+    ' ': ' '
+}
+
+MORSE_TO_LETTER = {
+    morse: letter
+    for letter, morse in LETTER_TO_MORSE.items()
+}
+
+# Таблица для str.translate: каждый символ сразу заменяется кодом
+# вместе с разделителем, поэтому промежуточный список не нужен
+_ENCODE_TABLE = str.maketrans({
+    letter: morse + ' '
+    for letter, morse in LETTER_TO_MORSE.items() if len(letter) == 1
+})
+_ALPHABET = frozenset(letter for letter in LETTER_TO_MORSE if len(letter) == 1)
+_ALPHABET_WITH_NEWLINE = _ALPHABET | {'\n'}
+_decode_symbol = MORSE_TO_LETTER.__getitem__
+
+# Двоичный формат: символ записывается 3-битной длиной кода L и затем
+# L битами кода (точка - 0, тире - 1), пробел имеет длину 0. Длина 7
+# завершает сообщение, в конце потока биты дополняются нулями до байта
+_LENGTH_BITS = 3
+_TERMINATOR = '111'
+_PACKED_CODES = {
+    letter: format(len(code), '03b') + code.translate(str.maketrans('.-', '01'))
+    for letter, code in ((letter, morse.strip())
+                         for letter, morse in LETTER_TO_MORSE.items() if len(letter) == 1)
+}
+_PACKED_CODES['\n'] = _TERMINATOR
+_PACK_TABLE = str.maketrans(_PACKED_CODES)
+_UNPACK_TABLE = {bits: letter for letter, bits in _PACKED_CODES.items()}
+_PACKED_SYMBOL = re.compile('|'.join(
+    format(length, '03b') + '[01]' * length for length in range(7)) + '|' + _TERMINATOR)
+
+
+def encode(message: str) -> str:
+    """
+    Кодирует строку в соответсвие с таблицей азбуки Морзе
+
+    >>> encode('SOS')
+    '... --- ...'
+    >>> encode(';HELP')
+    Traceback (most recent call last):
+    ...
+    KeyError: ';'
+    """
+    _check_alphabet(message)
+    return message.translate(_ENCODE_TABLE)[:-1]
+
+
+def decode(morse_message: str) -> str:
+    """
+    Декодирует строку из азбуки Морзе в английский
+
+    >>> decode('... --- ...')
+    'SOS'
+    """
+    return ''.join(map(_decode_symbol, morse_message.split()))
+
+
+def encode_many(messages: Iterable[str]) -> list[str]:
+    """
+    Кодирует несколько строк за один вызов str.translate
+
+    >>> encode_many(['SOS', '', 'E'])
+    ['... --- ...', '', '.']
+    """
+    messages = list(messages)
+    if not messages:
+        return []
+    joined = '\n'.join(messages)
+    if not _ALPHABET_WITH_NEWLINE.issuperset(joined) or joined.count('\n') != len(messages) - 1:
+        for message in messages:
+            _check_alphabet(message)
+    return [part[:-1] for part in joined.translate(_ENCODE_TABLE).split('\n')]
+
+
+def decode_many(morse_messages: Iterable[str]) -> list[str]:
+    """
+    Декодирует несколько строк из азбуки Морзе
+
+    >>> decode_many(['... --- ...', '.- .-'])
+    ['SOS', 'AA']
+    """
+    return [''.join(map(_decode_symbol, morse_message.split()))
+            for morse_message in morse_messages]
+
+
+class StreamDecoder:
+    """
+    Потоковый декодер азбуки Морзе: принимает текст или байты частями
+    произвольной длины. Символ, разрезанный границей части, дожидается
+    следующей части, поэтому результат совпадает с decode от всего потока
+
+    >>> decoder = StreamDecoder()
+    >>> decoder.feed(b'... -') + decoder.feed(b'-- ..') + decoder.feed(b'.') + decoder.finish()
+    'SOS'
+    """
+
+    def __init__(self):
+        self.__pending = ''
+
+    def feed(self, chunk) -> str:
+        """
+        Принимает очередную часть потока и возвращает буквы всех
+        символов, которые в ней закончились
+        """
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = chunk.decode('ascii')
+        text = self.__pending + chunk
+        symbols = text.split()
+        if symbols and not text[-1].isspace():
+            self.__pending = symbols.pop()
+        else:
+            self.__pending = ''
+        return ''.join(map(_decode_symbol, symbols))
+
+    def finish(self) -> str:
+        """
+        Завершает поток и возвращает букву последнего символа
+        """
+        pending, self.__pending = self.__pending, ''
+        return _decode_symbol(pending) if pending else ''
+
+
+def decode_stream(chunks: Iterable) -> Iterator[str]:
+    """
+    Декодирует поток, заданный частями (строками или байтами),
+    и возвращает буквы по мере поступления частей
+    """
+    decoder = StreamDecoder()
+    for chunk in chunks:
+        letters = decoder.feed(chunk)
+        if letters:
+            yield letters
+    letters = decoder.finish()
+    if letters:
+        yield letters
+
+
+def pack(message: str) -> bytes:
+    """
+    Упаковывает строку в двоичный формат азбуки Морзе: 3-9 бит на букву
+    вместо 2-7 байт текста encode
+
+    >>> pack('SOS')
+    b'a\\xf68'
+    >>> unpack(pack('SOS'))
+    'SOS'
+    """
+    return pack_many([message])
+
+
+def unpack(data: bytes) -> str:
+    """
+    Распаковывает одно сообщение, упакованное pack
+    """
+    messages = unpack_many(data)
+    if len(messages) != 1:
+        raise ValueError('Ожидалось одно сообщение, получено {}'.format(len(messages)))
+    return messages[0]
+
+
+def pack_many(messages: Iterable[str]) -> bytes:
+    """
+    Упаковывает несколько строк в один поток бит: все сообщения
+    переводятся одним вызовом str.translate и одним переводом в байты
+
+    >>> unpack_many(pack_many(['SOS', '', 'HELP']))
+    ['SOS', '', 'HELP']
+    """
+    messages = list(messages)
+    if not messages:
+        return b''
+    joined = '\n'.join(messages)
+    if not _ALPHABET_WITH_NEWLINE.issuperset(joined) or joined.count('\n') != len(messages) - 1:
+        for message in messages:
+            _check_alphabet(message)
+    bits = (joined + '\n').translate(_PACK_TABLE)
+    bits += '0' * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, 'big')
+
+
+def unpack_many(data: bytes) -> list[str]:
+    """
+    Распаковывает все сообщения, упакованные pack_many. Поток бит
+    разбивается на символы одним регулярным выражением
+    """
+    if not data:
+        return []
+    bits = format(int.from_bytes(data, 'big'), '0{}b'.format(len(data) * 8))
+    symbols = _PACKED_SYMBOL.findall(bits)
+    try:
+        letters = ''.join(map(_UNPACK_TABLE.__getitem__, symbols))
+    except KeyError as error:
+        raise ValueError('Некорректный символ {}'.format(error)) from None
+    # После последнего признака конца допускаются только нулевые биты
+    # дополнения до байта, которые читаются как пробелы
+    padding = len(letters) - letters.rfind('\n') - 1
+    end = sum(map(len, symbols)) - padding * _LENGTH_BITS
+    if padding > 2 or '\n' not in letters or len(bits) - end >= 8 or '1' in bits[end:]:
+        raise ValueError('Сообщение не завершено')
+    return letters[:len(letters) - padding].split('\n')[:-1]
+
+
+def _check_alphabet(message: str):
+    if not _ALPHABET.issuperset(message):
+        raise KeyError(next(letter for letter in message if letter not in _ALPHABET))
+
+
+if __name__ == '__main__':
+    morse_msg = '-- .- .. -....- .--. -.-- - .... --- -. -....- ..--- ----- .---- ----.'
+    decoded_msg = decode(morse_msg)
+    print(decoded_msg)
+    assert morse_msg == encode(decoded_msg)
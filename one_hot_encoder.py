@@ -0,0 +1,142 @@
+from array import array
+from itertools import repeat
+from typing import Iterable
+
+from sparse_matrix import CsrMatrix
+
+
+class OneHotEncoder:
+    """
+    В файле приведена реализация класса OneHotEncoder, который
+    сопоставляет каждой категории столбец и кодирует значения
+    унитарным кодом. Кодирование одного значения - поиск в словаре,
+    поэтому стоимость не зависит от числа категорий
+    """
+
+    OUTPUTS = ('tuples', 'index', 'sparse')
+
+    def __init__(self, output: str = 'tuples', handle_unknown: str = 'error'):
+        """
+        Инициализатор класса OneHotEncoder.
+        output - формат результата transform:
+                 'tuples' - список кортежей (значение, плотная строка),
+                            как у функции fit_transform
+                 'index' - список номеров столбцов
+                 'sparse' - разреженная матрица CsrMatrix
+        handle_unknown - 'error' - неизвестная при обучении категория
+                         вызывает ValueError, 'ignore' - кодируется
+                         нулевой строкой (номер столбца -1)
+        categories - список категорий в порядке первого появления
+        vocabulary - словарь, сопоставляющий категории номер столбца;
+                     первой встреченной категории соответствует
+                     последний столбец
+        """
+        if output not in self.OUTPUTS:
+            raise ValueError('output должен быть одним из {}, получено {!r}'.format(self.OUTPUTS, output))
+        if handle_unknown not in ('error', 'ignore'):
+            raise ValueError("handle_unknown должен быть 'error' или 'ignore', "
+                             "получено {!r}".format(handle_unknown))
+        self.output = output
+        self.handle_unknown = handle_unknown
+        self.categories = []
+        self.vocabulary = {}
+
+    def fit(self, values: Iterable) -> 'OneHotEncoder':
+        """
+        Функция определяет все уникальные категории
+        :param values: итерируемый объект с категориями (любые
+                       хешируемые значения)
+        :return: возвращается сам объект OneHotEncoder
+        """
+        self.categories = list(dict.fromkeys(values))
+        n_categories = len(self.categories)
+        self.vocabulary = {
+            category: n_categories - i - 1
+            for i, category in enumerate(self.categories)
+        }
+        return self
+
+    def transform(self, values: Iterable):
+        """
+        Функция кодирует значения по словарю, полученному в fit
+        :param values: итерируемый объект с категориями
+        :return: список кортежей, список номеров столбцов или
+                 CsrMatrix в зависимости от output
+        """
+        values = list(values)
+        if self.handle_unknown == 'error':
+            try:
+                columns = list(map(self.vocabulary.__getitem__, values))
+            except KeyError as error:
+                raise ValueError('Неизвестная категория: {!r}'.format(error.args[0])) from None
+        else:
+            columns = list(map(self.vocabulary.get, values, repeat(-1)))
+        if self.output == 'index':
+            return columns
+        if self.output == 'sparse':
+            return self.__sparse_transform(columns)
+        return [(value, self.__dense_row(column)) for value, column in zip(values, columns)]
+
+    def fit_transform(self, values: Iterable):
+        """
+        Функция определяет категории и кодирует значения
+        :param values: итерируемый объект с категориями
+        :return: результат transform
+        """
+        values = list(values)
+        return self.fit(values).transform(values)
+
+    def get_feature_names(self) -> list:
+        """
+        Функция возвращает категории в порядке столбцов
+        :return: список категорий
+        """
+        return self.categories[::-1]
+
+    def __dense_row(self, column: int) -> list:
+        """
+        Функция создает плотную строку для столбца column; каждый вызов
+        возвращает новый список, поэтому строки результата независимы
+        :param column: номер столбца (-1 - нулевая строка)
+        :return: список из нулей и не более чем одной единицы
+        """
+        row = [0] * len(self.categories)
+        if column >= 0:
+            row[column] = 1
+        return row
+
+    def __sparse_transform(self, columns: list) -> CsrMatrix:
+        """
+        Функция строит разреженную матрицу с одной единицей в строке
+        :param columns: номера столбцов (-1 - нулевая строка)
+        :return: матрица CsrMatrix
+        """
+        shape = (len(columns), len(self.categories))
+        if self.handle_unknown == 'error' or -1 not in columns:
+            return CsrMatrix(array('q', range(len(columns) + 1)), array('q', columns),
+                             array('q', [1]) * len(columns), shape)
+        indptr = array('q', [0])
+        indices = array('q')
+        for column in columns:
+            if column >= 0:
+                indices.append(column)
+            indptr.append(len(indices))
+        return CsrMatrix(indptr, indices, array('q', [1]) * len(indices), shape)
+
+
+def fit_transform(*args) -> list[tuple]:
+    """
+    Функция кодирует категории унитарным кодом
+    :param args: последовательность категорий или категории-строки
+                 как отдельные аргументы
+    :return: список кортежей (категория, плотная строка)
+    """
+    if not args:
+        raise TypeError('expected at least 1 arguments, got 0')
+    categories = args if isinstance(args[0], str) else list(args[0])
+    return OneHotEncoder().fit_transform(categories)
+
+
+if __name__ == '__main__':
+    cities = ['Moscow', 'New York', 'Moscow', 'London']
+    print(*fit_transform(cities), sep='\n')
@@ -0,0 +1,112 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+from sparse_matrix import CsrBuilder, CsrMatrix
+
+SHARD_SIZE = 10000
+
+
+class ShardCounts(NamedTuple):
+    """
+    Результат подсчета слов в одном фрагменте корпуса.
+    terms - слова фрагмента в порядке первого появления
+    term_counts - сколько раз встретилось каждое слово
+    document_frequency - в скольких документах встретилось каждое слово
+    n_documents - число документов во фрагменте
+    count_matrix - терм-документная матрица фрагмента (CsrMatrix,
+                   номера столбцов соответствуют terms) или None
+    """
+    terms: list
+    term_counts: list
+    document_frequency: list
+    n_documents: int
+    count_matrix: CsrMatrix
+
+
+def count_shard(corpus: list, analyzer: Callable = None, build_matrix: bool = True) -> ShardCounts:
+    """
+    Функция подсчитывает слова во фрагменте корпуса. Выполняется
+    в отдельном процессе, поэтому словарь фрагмента локальный
+    :param corpus: список предложений
+    :param analyzer: функция, разбивающая предложение на слова
+                     (по умолчанию lower().split())
+    :param build_matrix: если False, терм-документная матрица не строится
+    :return: возвращается ShardCounts
+    """
+    vocabulary = {}
+    term_counts = []
+    document_frequency = []
+    builder = CsrBuilder() if build_matrix else None
+    for sentence in corpus:
+        words = analyzer(sentence) if analyzer is not None else sentence.lower().split()
+        words_frequency = {}
+        for word in words:
+            column = vocabulary.get(word)
+            if column is None:
+                column = vocabulary[word] = len(vocabulary)
+                term_counts.append(0)
+                document_frequency.append(0)
+            term_counts[column] += 1
+            words_frequency[column] = words_frequency.get(column, 0) + 1
+        for column in words_frequency:
+            document_frequency[column] += 1
+        if builder is not None:
+            builder.append_row(words_frequency)
+    count_matrix = builder.build(len(vocabulary)) if builder is not None else None
+    return ShardCounts(list(vocabulary), term_counts, document_frequency, len(corpus), count_matrix)
+
+
+def iter_shard_counts(corpus: Iterable[str], n_jobs: int, analyzer: Callable = None,
+                      build_matrix: bool = True, shard_size: int = SHARD_SIZE) -> Iterator[ShardCounts]:
+    """
+    Функция делит корпус на фрагменты по shard_size предложений и
+    подсчитывает слова в них в пуле процессов. Результаты возвращаются
+    в порядке фрагментов, в обработке одновременно находится не больше
+    2 * n_jobs фрагментов, поэтому корпус может быть генератором.
+    Если корпус умещается в один фрагмент, пул не создается и слова
+    подсчитываются в текущем процессе (запуск пула дороже подсчета)
+    :param corpus: итерируемый объект с предложениями
+    :param n_jobs: число процессов (-1 или None - по числу ядер)
+    :param analyzer: функция, разбивающая предложение на слова
+                     (должна сериализоваться модулем pickle)
+    :param build_matrix: если False, терм-документные матрицы не строятся
+    :param shard_size: число предложений во фрагменте
+    :return: генератор ShardCounts
+    """
+    n_jobs = effective_n_jobs(n_jobs)
+    corpus = iter(corpus)
+    first_shard = list(islice(corpus, shard_size))
+    second_shard = list(islice(corpus, shard_size)) if len(first_shard) == shard_size else []
+    if n_jobs == 1 or not second_shard:
+        for shard in (first_shard, second_shard):
+            if shard:
+                yield count_shard(shard, analyzer, build_matrix)
+        for shard in iter(lambda: list(islice(corpus, shard_size)), []):
+            yield count_shard(shard, analyzer, build_matrix)
+        return
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = deque(executor.submit(count_shard, shard, analyzer, build_matrix)
+                        for shard in (first_shard, second_shard))
+        while True:
+            while len(pending) < 2 * n_jobs:
+                shard = list(islice(corpus, shard_size))
+                if not shard:
+                    break
+                pending.append(executor.submit(count_shard, shard, analyzer, build_matrix))
+            if not pending:
+                return
+            yield pending.popleft().result()
+
+
+def effective_n_jobs(n_jobs: int) -> int:
+    """
+    Функция переводит параметр n_jobs в число процессов
+    :param n_jobs: число процессов, -1 или None - по числу ядер
+    :return: число процессов (не меньше 1)
+    """
+    if n_jobs is None or n_jobs < 0:
+        return os.cpu_count() or 1
+    return max(n_jobs, 1)
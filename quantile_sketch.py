@@ -0,0 +1,144 @@
+import math
+import random
+from typing import Iterable
+
+
+class KllSketch:
+    """
+    В файле приведена реализация скетча KLL (Karnin, Lang, Liberty) для
+    приближенного вычисления квантилей за один проход. Хранится
+    O(k) значений независимо от их общего числа, а скетчи, построенные
+    по разным частям данных, можно объединять. Пока значений меньше
+    емкости скетча, квантили вычисляются точно
+    """
+
+    def __init__(self, k: int = 200, seed: int = None):
+        """
+        Инициализатор класса KllSketch
+        k - параметр точности: ошибка ранга порядка 1 / k
+        compactors - уровни скетча; значение на уровне h
+                     представляет 2 ** h исходных значений
+        n - число добавленных значений
+        :param seed: начальное значение генератора случайных чисел
+        """
+        self.k = k
+        self.compactors = [[]]
+        self.n = 0
+        self.__random = random.Random(seed)
+        self.__size = 0
+        self.__max_size = self.__capacity(0)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def add(self, value: float):
+        """
+        Функция добавляет значение в скетч
+        :param value: значение
+        :return: функция ничего не возвращает
+        """
+        self.compactors[0].append(value)
+        self.n += 1
+        self.__size += 1
+        if self.__size >= self.__max_size:
+            self.__compress()
+
+    def update(self, values: Iterable[float]) -> 'KllSketch':
+        """
+        Функция добавляет в скетч все значения из values
+        :param values: итерируемый объект со значениями
+        :return: возвращается сам объект KllSketch
+        """
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: 'KllSketch') -> 'KllSketch':
+        """
+        Функция добавляет в скетч значения другого скетча
+        :param other: объект KllSketch
+        :return: возвращается сам объект KllSketch
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.__grow()
+        for height, compactor in enumerate(other.compactors):
+            self.compactors[height].extend(compactor)
+        self.n += other.n
+        self.__size = sum(map(len, self.compactors))
+        while self.__size >= self.__max_size:
+            self.__compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """
+        Функция возвращает q-квантиль: наименьшее значение, не меньше
+        которого доля q добавленных значений (метод ближайшего ранга)
+        :param q: уровень квантиля от 0 до 1
+        :return: значение квантиля
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, levels: Iterable[float]) -> list:
+        """
+        Функция возвращает несколько квантилей за одну сортировку
+        :param levels: уровни квантилей от 0 до 1
+        :return: список значений квантилей
+        """
+        if not self.n:
+            raise ValueError('Скетч пуст')
+        items = sorted((value, 1 << height)
+                       for height, compactor in enumerate(self.compactors)
+                       for value in compactor)
+        total_weight = sum(weight for _, weight in items)
+        result = []
+        for q in levels:
+            if not 0 <= q <= 1:
+                raise ValueError('Уровень квантиля должен быть от 0 до 1, получено {}'.format(q))
+            rank = max(math.ceil(q * total_weight), 1)
+            cumulative_weight = 0
+            for value, weight in items:
+                cumulative_weight += weight
+                if cumulative_weight >= rank:
+                    result.append(value)
+                    break
+        return result
+
+    def __capacity(self, height: int) -> int:
+        """
+        Функция возвращает емкость уровня: верхний уровень вмещает k
+        значений, каждый следующий вниз - в 2 / 3 раза меньше
+        :param height: номер уровня
+        :return: емкость уровня
+        """
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil((2 / 3) ** depth * self.k)) + 1
+
+    def __grow(self):
+        """
+        Функция добавляет в скетч новый верхний уровень
+        :return: функция ничего не возвращает
+        """
+        self.compactors.append([])
+        self.__max_size = sum(self.__capacity(height) for height in range(len(self.compactors)))
+
+    def __compress(self):
+        """
+        Функция сжимает первый переполненный уровень: его значения
+        сортируются, и каждое второе (со случайным сдвигом) переходит
+        на уровень выше с удвоенным весом
+        :return: функция ничего не возвращает
+        """
+        for height in range(len(self.compactors)):
+            compactor = self.compactors[height]
+            if len(compactor) < self.__capacity(height):
+                continue
+            if height + 1 == len(self.compactors):
+                self.__grow()
+            compactor.sort()
+            last = compactor.pop() if len(compactor) % 2 else None
+            self.compactors[height + 1].extend(compactor[self.__random.randint(0, 1)::2])
+            compactor.clear()
+            if last is not None:
+                compactor.append(last)
+            self.__size = sum(map(len, self.compactors))
+            return
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from array import array
+from typing import Iterable
+
+from binary_storage import read_arrays, write_arrays
+
+BUFFER_SIZE = 1 << 20
+FORMATS = ('csv', 'jsonl', 'columnar')
+
+
+def write_report(destination, titles: list, rows: Iterable[list], report_format: str = 'csv',
+                 buffer_size: int = BUFFER_SIZE):
+    """
+    Функция записывает отчет в файл. Строки отчета накапливаются в буфере
+    размером около buffer_size и записываются крупными блоками.
+    Форматы:
+    'csv' - текст, поля разделены ';', первая строка - заголовки
+    'jsonl' - JSON Lines, каждая строка отчета - объект {заголовок: значение}
+    'columnar' - двоичный столбцовый формат: каждый столбец хранится
+                 типизированным массивом (см. read_columnar_report)
+    :param destination: путь к файлу или открытый файловый объект
+                        (текстовый для 'csv' и 'jsonl', двоичный для
+                        'columnar')
+    :param titles: заголовки столбцов
+    :param rows: итерируемый объект со строками отчета
+    :param report_format: формат файла
+    :param buffer_size: размер буфера записи в байтах
+    :return: функция ничего не возвращает
+    """
+    if report_format not in FORMATS:
+        raise ValueError('Неизвестный формат отчета {!r}, доступны: {}'.format(
+            report_format, ', '.join(FORMATS)))
+    if report_format == 'columnar':
+        _write_columnar(destination, titles, rows)
+        return
+    if hasattr(destination, 'write'):
+        _write_text(destination, titles, rows, report_format, buffer_size)
+        return
+    with open(destination, 'w', buffering=buffer_size) as file:
+        _write_text(file, titles, rows, report_format, buffer_size)
+
+
+def read_columnar_report(path: str, mmap: bool = False) -> dict:
+    """
+    Функция читает отчет, записанный в формате 'columnar'
+    :param path: путь к файлу
+    :param mmap: если True, числовые столбцы отображаются из файла
+                 в память без копирования
+    :return: словарь {заголовок: столбец}, числовой столбец - массив
+             (array.array или memoryview), текстовый - список строк
+    """
+    header, arrays = read_arrays(path, mmap)
+    if header.get('kind') != 'report':
+        raise ValueError('Файл {} не является отчетом'.format(path))
+    columns = {}
+    for i, (title, column_type) in enumerate(zip(header['titles'], header['types'])):
+        if column_type != 'str':
+            columns[title] = arrays[str(i)]
+            continue
+        offsets, encoded = arrays['{}.offsets'.format(i)], bytes(arrays[str(i)])
+        columns[title] = [encoded[offsets[j]:offsets[j + 1]].decode('utf-8')
+                          for j in range(len(offsets) - 1)]
+    return columns
+
+
+def _write_text(file, titles: list, rows: Iterable[list], report_format: str, buffer_size: int):
+    """
+    Функция записывает отчет в текстовом формате через буфер в памяти
+    :param file: текстовый файловый объект
+    :param titles: заголовки столбцов
+    :param rows: итерируемый объект со строками отчета
+    :param report_format: 'csv' или 'jsonl'
+    :param buffer_size: размер буфера записи в символах
+    :return: функция ничего не возвращает
+    """
+    buffer = io.StringIO()
+    if report_format == 'csv':
+        writer = csv.writer(buffer, delimiter=';', lineterminator='\n')
+        writer.writerow(titles)
+        write_row = writer.writerow
+    else:
+        def write_row(row):
+            buffer.write(json.dumps(dict(zip(titles, row)), ensure_ascii=False))
+            buffer.write('\n')
+    for row in rows:
+        write_row(row)
+        if buffer.tell() >= buffer_size:
+            file.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+    file.write(buffer.getvalue())
+
+
+def _write_columnar(destination, titles: list, rows: Iterable[list]):
+    """
+    Функция записывает отчет в двоичном столбцовом формате. Тип столбца
+    определяется по значениям: целые числа хранятся в array('q'),
+    дробные - в array('d'), строки - в UTF-8 со смещениями
+    :param destination: путь к файлу или двоичный файловый объект
+    :param titles: заголовки столбцов
+    :param rows: итерируемый объект со строками отчета
+    :return: функция ничего не возвращает
+    """
+    columns = [[] for _ in titles]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+    types, arrays = [], {}
+    for i, column in enumerate(columns):
+        if all(isinstance(value, int) and not isinstance(value, bool) for value in column):
+            types.append('int')
+            arrays[str(i)] = ('q', column)
+        elif all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in column):
+            types.append('float')
+            arrays[str(i)] = ('d', column)
+        else:
+            types.append('str')
+            encoded = [str(value).encode('utf-8') for value in column]
+            offsets = array('q', [0])
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            arrays[str(i)] = ('B', b''.join(encoded))
+            arrays['{}.offsets'.format(i)] = ('q', offsets)
+    header = {'kind': 'report', 'titles': list(titles), 'types': types,
+              'n_rows': len(columns[0]) if columns else 0}
+    write_arrays(destination, header, arrays)
@@ -0,0 +1,207 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CsrMatrix:
+    """
+    В файле приведена реализация разреженной матрицы в формате CSR
+    (compressed sparse row). Хранятся только ненулевые элементы,
+    поэтому память пропорциональна их количеству, а не размеру матрицы
+    """
+
+    def __init__(self, indptr, indices, data, shape: tuple[int, int]):
+        """
+        Инициализатор класса CsrMatrix.
+        indptr - массив длины n_rows + 1, строка i занимает
+                 элементы indptr[i]:indptr[i + 1] массивов indices и data
+        indices - номера столбцов ненулевых элементов
+        data - значения ненулевых элементов
+        shape - размерность матрицы (число строк, число столбцов)
+        Массивы могут быть array.array, numpy.ndarray или memoryview
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+    @classmethod
+    def from_dense(cls, rows: list, typecode: str = 'q') -> 'CsrMatrix':
+        """
+        Функция строит разреженную матрицу по плотной
+        :param rows: список строк (списков) одинаковой длины
+                     или двумерный numpy.ndarray
+        :param typecode: тип элементов массива data (как в модуле array)
+        :return: матрица CsrMatrix
+        """
+        builder = CsrBuilder(typecode)
+        for row in rows:
+            builder.append_row({column: value for column, value in enumerate(row) if value})
+        return builder.build(len(rows[0]) if len(rows) else 0)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @property
+    def nnz(self) -> int:
+        """
+        Функция возвращает количество хранимых (ненулевых) элементов
+        :return: количество элементов
+        """
+        return int(self.indptr[-1])
+
+    def row(self, i: int) -> tuple:
+        """
+        Функция возвращает i-ю строку матрицы
+        :param i: номер строки
+        :return: кортеж (номера столбцов, значения)
+        """
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def toarray(self) -> list:
+        """
+        Функция переводит матрицу в плотный вид
+        :return: список списков длины shape[1]
+        """
+        n_rows, n_columns = self.shape
+        zero = 0.0 if _is_float(self.data) else 0
+        indptr, indices, data = _tolist(self.indptr), _tolist(self.indices), _tolist(self.data)
+        dense = []
+        for i in range(n_rows):
+            dense_row = [zero] * n_columns
+            for j in range(indptr[i], indptr[i + 1]):
+                dense_row[indices[j]] = data[j]
+            dense.append(dense_row)
+        return dense
+
+    def to_numpy(self) -> 'CsrMatrix':
+        """
+        Функция возвращает ту же матрицу с массивами numpy.ndarray.
+        Для array.array и memoryview данные не копируются
+        :return: матрица CsrMatrix на основе numpy
+        """
+        import numpy as np
+        return CsrMatrix(np.asarray(self.indptr), np.asarray(self.indices),
+                         np.asarray(self.data), self.shape)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CsrMatrix):
+            return NotImplemented
+        return (tuple(self.shape) == tuple(other.shape)
+                and _tolist(self.indptr) == _tolist(other.indptr)
+                and _tolist(self.indices) == _tolist(other.indices)
+                and _tolist(self.data) == _tolist(other.data))
+
+    def __repr__(self) -> str:
+        return 'CsrMatrix(shape={}, nnz={})'.format(self.shape, self.nnz)
+
+
+class CsrBuilder:
+    """
+    Построитель матрицы CsrMatrix: строки добавляются по одной,
+    массивы растут без промежуточных плотных строк
+    """
+
+    def __init__(self, typecode: str = 'q'):
+        """
+        Инициализатор класса CsrBuilder
+        typecode - тип элементов массива data (как в модуле array)
+        """
+        self.indptr = array('q', [0])
+        self.indices = array('q')
+        self.data = array(typecode)
+        self.n_columns = 0
+
+    def append_row(self, row: dict):
+        """
+        Функция добавляет строку в матрицу
+        :param row: словарь {номер столбца: значение}, нули не хранятся
+        :return: функция ничего не возвращает
+        """
+        for column in sorted(row):
+            value = row[column]
+            if value:
+                self.indices.append(column)
+                self.data.append(value)
+                if column >= self.n_columns:
+                    self.n_columns = column + 1
+        self.indptr.append(len(self.indices))
+
+    def extend(self, matrix: CsrMatrix, column_mapping=None):
+        """
+        Функция добавляет в матрицу все строки matrix. Если задан
+        column_mapping, столбец j переходит в столбец column_mapping[j],
+        а элементы столбцов с column_mapping[j] == -1 отбрасываются.
+        Номера столбцов в строках остаются упорядоченными
+        :param matrix: добавляемая матрица CsrMatrix
+        :param column_mapping: последовательность новых номеров столбцов
+        :return: функция ничего не возвращает
+        """
+        if column_mapping is None:
+            column_mapping = range(matrix.shape[1])
+        if np is not None:
+            self.__numpy_extend(matrix, column_mapping)
+            return
+        indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+        for i in range(matrix.shape[0]):
+            row = {}
+            for j in range(indptr[i], indptr[i + 1]):
+                column = column_mapping[indices[j]]
+                if column >= 0:
+                    row[column] = data[j]
+            self.append_row(row)
+
+    def __numpy_extend(self, matrix: CsrMatrix, column_mapping):
+        """
+        Функция делает то же, что extend, но векторизованно:
+        столбцы перенумеровываются одной индексацией, а строки
+        упорядочиваются одной сортировкой lexsort
+        :param matrix: добавляемая матрица CsrMatrix
+        :param column_mapping: последовательность новых номеров столбцов
+        :return: функция ничего не возвращает
+        """
+        n_rows = matrix.shape[0]
+        indptr = np.asarray(matrix.indptr, dtype=np.int64)
+        mapping = np.asarray(column_mapping, dtype=np.int64)
+        indices = mapping[np.asarray(matrix.indices, dtype=np.int64)]
+        data = np.asarray(matrix.data, dtype=np.dtype(self.data.typecode))
+        rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+        keep = (indices >= 0) & (data != 0)
+        indices, data, rows = indices[keep], data[keep], rows[keep]
+        order = np.lexsort((indices, rows))
+        new_indptr = np.cumsum(np.bincount(rows, minlength=n_rows)) + len(self.indices)
+        self.indices.frombytes(indices[order].tobytes())
+        self.data.frombytes(data[order].tobytes())
+        self.indptr.frombytes(new_indptr.astype(np.int64).tobytes())
+        if len(indices):
+            self.n_columns = max(self.n_columns, int(indices.max()) + 1)
+
+    def build(self, n_columns: int = None) -> CsrMatrix:
+        """
+        Функция возвращает построенную матрицу
+        :param n_columns: число столбцов матрицы (по умолчанию
+                          определяется по максимальному номеру столбца)
+        :return: матрица CsrMatrix
+        """
+        if n_columns is None:
+            n_columns = self.n_columns
+        return CsrMatrix(self.indptr, self.indices, self.data,
+                         (len(self.indptr) - 1, n_columns))
+
+
+def _is_float(data) -> bool:
+    typecode = getattr(data, 'typecode', None)
+    if typecode is None:
+        typecode = getattr(data, 'format', None)
+    if typecode is None:
+        dtype = getattr(data, 'dtype', None)
+        return dtype is not None and dtype.kind == 'f'
+    return typecode in ('f', 'd')
+
+
+def _tolist(values) -> list:
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
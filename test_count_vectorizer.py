@@ -0,0 +1,78 @@
+import HW_3_CountVectorizer
+import HW_4_TfIdfVectorizer
+import parallel_counting
+import pytest
+
+
+CORPUS = ['a b', 'a c', 'a d']
+VECTORIZERS = [HW_3_CountVectorizer.CountVectorizer, HW_4_TfIdfVectorizer.CountVectorizer]
+
+
+@pytest.mark.parametrize("vectorizer_class", VECTORIZERS)
+@pytest.mark.parametrize(
+    "params,feature_names", [
+        ({}, ['a', 'b', 'c', 'd']),
+        ({'max_df': 1}, ['b', 'c', 'd']),
+        ({'max_df': 0.5}, ['b', 'c', 'd']),
+        ({'min_df': 2}, ['a']),
+        ({'min_df': 1.0}, ['a']),
+        ({'min_df': 1.0, 'max_df': 1.0}, ['a']),
+        ({'max_features': 1}, ['a']),
+        ({'max_df': 1, 'max_features': 2}, ['b', 'c']),
+    ],
+)
+def test_pruning(vectorizer_class, params, feature_names):
+    vectorizer = vectorizer_class(**params)
+    assert vectorizer.fit(CORPUS).get_feature_names() == feature_names
+    count_matrix = vectorizer_class(**params).fit_transform(CORPUS)
+    assert count_matrix == vectorizer.transform(CORPUS)
+    assert [sum(column) for column in zip(*count_matrix)] == [
+        sum(sentence.split().count(term) for sentence in CORPUS) for term in feature_names]
+
+
+@pytest.mark.parametrize("vectorizer_class", VECTORIZERS)
+def test_pruning_limits(vectorizer_class):
+    with pytest.raises(ValueError):
+        vectorizer_class(min_df=3, max_df=1).fit(CORPUS)
+
+
+@pytest.mark.parametrize("vectorizer_class", VECTORIZERS)
+@pytest.mark.parametrize("n_jobs", [1, 2])
+@pytest.mark.parametrize(
+    "params,feature_names,pruned_terms", [
+        ({'min_df': 2}, ['a', 'b', 'c', 'new'], {'rare'}),
+        ({'max_features': 2}, ['a', 'b', 'new'], {'c', 'rare'}),
+    ],
+)
+def test_partial_fit_skips_pruned_terms(vectorizer_class, n_jobs, params, feature_names, pruned_terms):
+    vectorizer = vectorizer_class(n_jobs=n_jobs, **params).fit(['a b rare', 'a c', 'a b', 'b c'])
+    assert vectorizer.pruned_terms == pruned_terms
+    vectorizer.partial_fit(['rare a', 'new c'])
+    assert vectorizer.get_feature_names() == feature_names
+    assert vectorizer.document_frequency == [
+        sum(term in sentence.split() for sentence in ['a b rare', 'a c', 'a b', 'b c', 'rare a', 'new c'])
+        for term in feature_names]
+    assert vectorizer.n_documents == 6
+    vectorizer.fit(['rare', 'rare'])
+    assert vectorizer.pruned_terms == set() and vectorizer.get_feature_names() == ['rare']
+
+
+def test_single_shard_runs_without_pool(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError('пул процессов не должен создаваться')
+
+    monkeypatch.setattr(parallel_counting, 'ProcessPoolExecutor', no_pool)
+    vectorizer = HW_4_TfIdfVectorizer.TfidfVectorizer(n_jobs=4).fit(CORPUS)
+    serial_vectorizer = HW_4_TfIdfVectorizer.TfidfVectorizer().fit(CORPUS)
+    assert vectorizer.transform(['a b']) == serial_vectorizer.transform(['a b'])
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+@pytest.mark.parametrize("shard_size", [1, 2, 3, 4])
+def test_iter_shard_counts(n_jobs, shard_size):
+    shards = list(parallel_counting.iter_shard_counts(CORPUS, n_jobs, shard_size=shard_size))
+    assert [shard.n_documents for shard in shards] == [
+        min(shard_size, len(CORPUS) - start) for start in range(0, len(CORPUS), shard_size)]
+    assert [term for shard in shards for term in shard.terms] == [
+        term for start in range(0, len(CORPUS), shard_size)
+        for term in parallel_counting.count_shard(CORPUS[start:start + shard_size]).terms]
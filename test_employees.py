@@ -0,0 +1,133 @@
+import locale
+import random
+
+from HW_2_Employees import (GroupedStatistics, clear_statistics_cache, get_cached_statistics,
+                            get_employee_table, get_employees, get_statistics,
+                            get_statistics_from_files, get_summary, split_file)
+import pytest
+
+
+HEADER = 'ФИО;Департамент;Отдел;Должность;Оценка;Оклад\n'
+EMPLOYEES = [
+    'A;Деп1;Команда1;Пост1;4.5;100\n',
+    'B;Деп1;Команда2;Пост2;3.0;200\n',
+    'C;Деп2;Команда3;Пост1;5.0;150\n',
+]
+
+
+def write(path, text, mode='w'):
+    with open(path, mode, encoding=locale.getpreferredencoding(False)) as file:
+        file.write(text)
+
+
+@pytest.mark.parametrize(
+    "tail,rest", [
+        ('X;Деп1;Команда1;Пост1;4.0;1', '00\n'),
+        ('Y;Деп1;Ком', 'анда1;Пост1;4.0;300\n'),
+    ],
+)
+def test_incremental_ignores_unterminated_line(tmp_path, tail, rest):
+    path = tmp_path / 'employees.csv'
+    write(path, HEADER + ''.join(EMPLOYEES))
+    clear_statistics_cache()
+    expected = get_statistics(path).summary()
+    assert get_cached_statistics(path, incremental=True).summary() == expected
+    write(path, tail, 'a')
+    assert get_cached_statistics(path, incremental=True).summary() == expected
+    write(path, rest, 'a')
+    assert get_cached_statistics(path, incremental=True).summary() == get_statistics(path).summary()
+
+
+@pytest.fixture
+def employee_files(tmp_path):
+    paths = []
+    for i in range(2):
+        path = tmp_path / 'employees_{}.csv'.format(i)
+        write(path, HEADER + ''.join(EMPLOYEES[i:]) + 'D{0};Деп{0};Команда{0};Пост3;2.5;7{0}\n'.format(i))
+        paths.append(str(path))
+    return paths
+
+
+def test_chunk_boundaries(employee_files):
+    path = employee_files[0]
+    expected = get_statistics(path).summary()
+    with open(path, 'rb') as file:
+        size = len(file.read())
+    for chunk_size in range(1, size + 1):
+        chunks = split_file(path, chunk_size)
+        assert chunks[0][1] == len(HEADER.encode(locale.getpreferredencoding(False)))
+        assert chunks[-1][2] == size
+        assert get_statistics_from_files([path], n_jobs=1, chunk_size=chunk_size).summary() == expected
+
+
+@pytest.mark.parametrize("n_jobs", [0, 1, 2, None])
+def test_statistics_from_files(tmp_path, employee_files, n_jobs):
+    expected = get_statistics(employee_files[0]).merge(get_statistics(employee_files[1])).summary()
+    statistics = get_statistics_from_files(str(tmp_path / 'employees_*.csv'), n_jobs=n_jobs, chunk_size=40)
+    assert statistics.summary() == expected
+
+
+def test_statistics_from_no_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        get_statistics_from_files(str(tmp_path / 'missing_*.csv'))
+
+
+def baseline_summary(employees):
+    summary = {}
+    for employee in employees:
+        if employee[1] not in summary:
+            summary[employee[1]] = [0, 10 ** 6, 0, 0]
+        summary[employee[1]][0] += 1
+        if employee[5] < summary[employee[1]][1]:
+            summary[employee[1]][1] = employee[5]
+        if employee[5] > summary[employee[1]][2]:
+            summary[employee[1]][2] = employee[5]
+        summary[employee[1]][3] += employee[5]
+    for key in summary.keys():
+        summary[key][3] = round(summary[key][3] / summary[key][0], 3)
+    return [[department, *summary[department]] for department in sorted(summary)]
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    generator = random.Random(0)
+    path = tmp_path / 'large.csv'
+    write(path, HEADER + ''.join(
+        'E{};Деп{};Команда{};Пост{};{};{}\n'.format(
+            i, generator.randint(1, 5), generator.randint(1, 9), generator.randint(1, 3),
+            generator.randint(1, 10) / 2, generator.randint(10, 500) * 1000)
+        for i in range(3000)))
+    return str(path)
+
+
+def test_statistics_matches_baseline(large_file):
+    expected = baseline_summary(get_employees(large_file))
+    assert get_summary(get_statistics(large_file)) == expected
+
+
+def test_cached_statistics_matches_baseline(large_file):
+    expected = baseline_summary(get_employees(large_file))
+    clear_statistics_cache()
+    assert get_summary(get_cached_statistics(large_file)) == expected
+    assert get_summary(get_cached_statistics(large_file)) == expected
+    assert get_summary(get_cached_statistics(large_file, incremental=True)) == expected
+
+
+def test_employee_table_matches_baseline(large_file):
+    expected = baseline_summary(get_employees(large_file))
+    assert get_summary(get_employee_table(large_file)) == expected
+    assert get_employee_table(large_file).teams_by_department() \
+        == get_statistics(large_file).teams_by_department()
+
+
+def test_chunked_statistics_matches_baseline(large_file):
+    expected = baseline_summary(get_employees(large_file))
+    assert get_summary(get_statistics_from_files([large_file], n_jobs=2, chunk_size=4096)) == expected
+
+
+def test_grouped_statistics(large_file):
+    employees = get_employees(large_file)
+    report = GroupedStatistics(['department'], employees).report()
+    assert [row[:5] for row in report] == baseline_summary(employees)
+    chunked = get_statistics_from_files([large_file], n_jobs=1, chunk_size=4096, keys=['department'])
+    assert [row[:5] for row in chunked.report()] == [row[:5] for row in report]
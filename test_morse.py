@@ -0,0 +1,67 @@
+from morse import (decode, decode_many, decode_stream, encode, encode_many,
+                   pack, pack_many, unpack, unpack_many)
+import pytest
+
+
+@pytest.mark.parametrize(
+    "messages", [
+        [],
+        ['SOS'],
+        ['SOS', '', 'HELP', 'A B'],
+        ['MAI-PYTHON-2019', '(1/2)?', '.'],
+    ],
+)
+def test_encode_many(messages):
+    assert encode_many(messages) == [encode(message) for message in messages]
+
+
+@pytest.mark.parametrize(
+    "messages", [
+        [';HELP'],
+        ['SOS', 'a'],
+        ['A\nB'],
+    ],
+)
+def test_encode_many_unknown_letter(messages):
+    with pytest.raises(KeyError):
+        encode_many(messages)
+
+
+def test_decode_many():
+    morse_messages = ['... --- ...', '.... . .-.. .--.', '']
+    assert decode_many(morse_messages) == [decode(message) for message in morse_messages]
+
+
+@pytest.mark.parametrize(
+    "chunks,result", [
+        ([b'... --- ...'], 'SOS'),
+        ([b'... -', b'-- ..', b'.'], 'SOS'),
+        (['.', '.', '. ', '--', '-'], 'SO'),
+        ([b'.... . ', b'.-.. .--.', b''], 'HELP'),
+    ],
+)
+def test_decode_stream(chunks, result):
+    assert ''.join(decode_stream(chunks)) == result
+
+
+@pytest.mark.parametrize(
+    "message", ['SOS', '', 'A B', 'MAI-PYTHON-2019', '(1/2)?'],
+)
+def test_pack(message):
+    assert unpack(pack(message)) == message
+    assert encode(unpack(pack(message))) == encode(message)
+
+
+def test_pack_many():
+    messages = ['SOS', '', 'HELP ', 'MAI-PYTHON-2019']
+    packed = pack_many(messages)
+    assert unpack_many(packed) == messages
+    assert len(packed) < sum(map(len, encode_many(messages))) / 4
+
+
+@pytest.mark.parametrize(
+    "data", [pack('SOS')[:-1], pack('SOS') + b'\x00', b'\x00', b'\xdf\xff'],
+)
+def test_unpack_invalid(data):
+    with pytest.raises(ValueError):
+        unpack_many(data)
@@ -0,0 +1,38 @@
+from one_hot_encoder import OneHotEncoder, fit_transform
+import pytest
+
+
+CITIES = ['Moscow', 'New York', 'Moscow', 'London']
+
+
+@pytest.mark.parametrize(
+    "output,result", [
+        ('tuples', fit_transform(CITIES)),
+        ('index', [2, 1, 2, 0]),
+    ],
+)
+def test_transform(output, result):
+    encoder = OneHotEncoder(output=output).fit(CITIES)
+    assert encoder.transform(CITIES) == result
+
+
+def test_sparse_transform():
+    encoder = OneHotEncoder(output='sparse').fit(CITIES)
+    assert encoder.transform(CITIES).toarray() == [row for _, row in fit_transform(CITIES)]
+    assert encoder.get_feature_names() == ['London', 'New York', 'Moscow']
+
+
+def test_unknown_category():
+    with pytest.raises(ValueError):
+        OneHotEncoder().fit(CITIES).transform(['Paris'])
+    encoder = OneHotEncoder(output='sparse', handle_unknown='ignore').fit(CITIES)
+    assert encoder.transform(['Paris', 'London']).toarray() == [[0, 0, 0], [1, 0, 0]]
+    assert OneHotEncoder(output='index', handle_unknown='ignore').fit(CITIES).transform(['Paris']) == [-1]
+
+
+def test_tuples_rows_are_independent():
+    encoder = OneHotEncoder().fit(['a', 'b'])
+    rows = encoder.transform(['a', 'a'])
+    rows[0][1][0] = 99
+    assert rows[1][1] == [0, 1]
+    assert encoder.transform(['a']) == [('a', [0, 1])]
@@ -0,0 +1,41 @@
+import math
+import random
+
+from quantile_sketch import KllSketch
+import pytest
+
+
+LEVELS = [0.0, 0.1, 0.5, 0.9, 1.0]
+
+
+def exact_quantiles(values, levels):
+    values = sorted(values)
+    return [values[max(math.ceil(q * len(values)), 1) - 1] for q in levels]
+
+
+def test_small_sketch_is_exact():
+    values = random.Random(0).sample(range(1000), 100)
+    sketch = KllSketch(k=200, seed=0).update(values)
+    assert sketch.quantiles(LEVELS) == exact_quantiles(values, LEVELS)
+    merged = KllSketch(k=200, seed=0).update(values[:30]).merge(KllSketch(k=200).update(values[30:]))
+    assert merged.quantiles(LEVELS) == exact_quantiles(values, LEVELS)
+
+
+@pytest.mark.parametrize("n_parts", [1, 2, 7])
+def test_merge(n_parts):
+    generator = random.Random(1)
+    values = [generator.random() for _ in range(20000)]
+    merged = KllSketch(k=200, seed=0)
+    for i in range(n_parts):
+        merged.merge(KllSketch(k=200, seed=i).update(values[i::n_parts]))
+    assert len(merged) == len(values)
+    assert sum(map(len, merged.compactors)) < 2000
+    values.sort()
+    for q, estimate in zip(LEVELS[1:-1], merged.quantiles(LEVELS[1:-1])):
+        rank = values.index(estimate) / len(values)
+        assert abs(rank - q) < 0.02
+
+
+def test_empty_sketch():
+    with pytest.raises(ValueError):
+        KllSketch().quantile(0.5)
@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+
+from report_writer import read_columnar_report, write_report
+import pytest
+
+
+TITLES = ['Департамент', 'Численность', 'Средняя зарплата']
+ROWS = [['Деп1', 2, 150.5], ['Деп2; "и другие"', 1, 150.0]]
+
+
+def test_csv():
+    file = io.StringIO()
+    write_report(file, TITLES, ROWS, buffer_size=8)
+    rows = list(csv.reader(io.StringIO(file.getvalue()), delimiter=';'))
+    assert rows == [TITLES] + [[str(value) for value in row] for row in ROWS]
+
+
+def test_jsonl():
+    file = io.StringIO()
+    write_report(file, TITLES, iter(ROWS), 'jsonl')
+    assert [json.loads(line) for line in file.getvalue().splitlines()] \
+        == [dict(zip(TITLES, row)) for row in ROWS]
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_columnar(tmp_path, mmap):
+    path = str(tmp_path / 'report.bin')
+    write_report(path, TITLES, ROWS, 'columnar')
+    columns = read_columnar_report(path, mmap)
+    assert list(columns) == TITLES
+    assert [list(column) for column in columns.values()] == [list(column) for column in zip(*ROWS)]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        write_report(io.StringIO(), TITLES, ROWS, 'xml')
@@ -0,0 +1,68 @@
+import math
+import random
+
+from HW_4_TfIdfVectorizer import TfidfVectorizer
+from tfidf_search import TfidfIndex
+import pytest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+WORDS = ['pasta', 'parmesan', 'fresh', 'boil', 'taste', 'pot', 'crock', 'never', 'again', 'to']
+ENGINES = ['python', pytest.param('numpy', marks=pytest.mark.skipif(np is None, reason='нет numpy'))]
+GENERATOR = random.Random(0)
+CORPUS = [' '.join(GENERATOR.choices(WORDS, k=GENERATOR.randint(1, 8))) for _ in range(200)]
+QUERIES = ['fresh pasta', 'boil', 'crock pot again', 'unknown words', 'parmesan parmesan to']
+
+
+def brute_force(vectorizer, tfidf_matrix, query, k):
+    query_matrix = vectorizer.transform([query])
+    query_row = query_matrix.toarray()[0] if vectorizer.sparse else query_matrix[0]
+    query_norm = math.sqrt(sum(value * value for value in query_row))
+    scores = []
+    for i, row in enumerate(tfidf_matrix):
+        norm = math.sqrt(sum(value * value for value in row))
+        dot = sum(a * b for a, b in zip(query_row, row))
+        if query_norm and norm and dot > 0:
+            scores.append((i, dot / query_norm / norm))
+    scores.sort(key=lambda item: (-item[1], item[0]))
+    return scores[:k]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("sparse", [False, True])
+def test_most_similar(engine, sparse):
+    vectorizer = TfidfVectorizer(sparse=sparse)
+    tfidf_matrix = vectorizer.fit_transform(CORPUS)
+    index = TfidfIndex(vectorizer, engine).fit(tfidf_matrix)
+    dense_matrix = tfidf_matrix.toarray() if sparse else tfidf_matrix
+    for query in QUERIES:
+        result = index.most_similar(query, k=10)
+        expected = brute_force(vectorizer, dense_matrix, query, k=10)
+        assert [row for row, _ in result] == [row for row, _ in expected]
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_most_similar_many(engine):
+    vectorizer = TfidfVectorizer(sparse=True)
+    tfidf_matrix = vectorizer.fit_transform(CORPUS)
+    index = TfidfIndex(vectorizer, engine).fit(tfidf_matrix)
+    expected = [index.most_similar(query, k=5) for query in QUERIES]
+    assert index.most_similar_many(QUERIES, k=5) == expected
+    index.n_jobs = 2
+    assert index.most_similar_many(QUERIES * 100, k=5) == expected * 100
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_vectorizer_changed_after_fit(engine):
+    vectorizer = TfidfVectorizer(sparse=True)
+    tfidf_matrix = vectorizer.fit_transform(CORPUS)
+    index = TfidfIndex(vectorizer, engine).fit(tfidf_matrix)
+    expected = index.most_similar('fresh pasta', k=5)
+    vectorizer.partial_fit(['newword fresh pasta'])
+    vectorizer.update(['another newterm'])
+    assert index.most_similar('newword fresh pasta newterm', k=5) == expected
@@ -0,0 +1,48 @@
+import asyncio
+
+from HW_4_TfIdfVectorizer import TfidfVectorizer
+from tfidf_service import LocalClient, TfidfBatchService
+import pytest
+
+
+CORPUS = [
+    'Crock Pot Pasta Never boil pasta again',
+    'Pasta Pomodoro Fresh ingredients Parmesan to taste'
+]
+QUERIES = ['Pasta with fresh Parmesan', 'boil pasta', 'taste', 'Pot Pomodoro'] * 3
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_transform_many(sparse):
+    vectorizer = TfidfVectorizer(sparse=sparse).fit(CORPUS)
+
+    async def run():
+        async with TfidfBatchService(vectorizer, max_batch_size=5, max_delay=0.05) as service:
+            return await service.transform_many(QUERIES), service.n_batches
+
+    rows, n_batches = asyncio.run(run())
+    expected = vectorizer.transform(QUERIES)
+    if sparse:
+        rows = [(list(indices), list(data)) for indices, data in rows]
+        expected = [tuple(map(list, expected.row(i))) for i in range(len(QUERIES))]
+    assert rows == expected
+    assert n_batches == 3
+
+
+def test_local_client():
+    vectorizer = TfidfVectorizer().fit(CORPUS)
+
+    async def run():
+        async with TfidfBatchService(vectorizer, max_delay=0.001) as service:
+            client = LocalClient(service)
+            return await client.post({'document': QUERIES[0]}), await client.post({})
+
+    response, error = asyncio.run(run())
+    assert response == {'vector': vectorizer.transform(QUERIES[:1])[0]}
+    assert 'error' in error
+
+
+def test_not_started():
+    service = TfidfBatchService(TfidfVectorizer().fit(CORPUS))
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.transform(QUERIES[0]))
@@ -0,0 +1,206 @@
+import math
+import random
+
+import HW_3_CountVectorizer
+from HW_4_TfIdfVectorizer import CountVectorizer, HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from instrumentation import Instrumentation
+from parallel_counting import SHARD_SIZE
+from sparse_matrix import CsrMatrix
+import pytest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+CORPUS = [
+    'Crock Pot Pasta Never boil pasta again',
+    'Pasta Pomodoro Fresh ingredients Parmesan to taste',
+    'Pasta with fresh Parmesan',
+]
+WORDS = ['pasta', 'parmesan', 'fresh', 'boil', 'taste', 'pot', 'crock', 'never', 'again', 'to']
+ENGINES = ['python', pytest.param('numpy', marks=pytest.mark.skipif(np is None, reason='нет numpy'))]
+
+
+def random_corpus(n_documents, seed=0):
+    generator = random.Random(seed)
+    return [' '.join(generator.choices(WORDS, k=generator.randint(1, 8))).title()
+            for _ in range(n_documents)]
+
+
+def baseline_count_matrix(corpus):
+    sentences = [sentence.lower().split() for sentence in corpus]
+    features = list(dict.fromkeys(word for sentence in sentences for word in sentence))
+    return [[sentence.count(word) for word in features] for sentence in sentences]
+
+
+def baseline_tfidf_matrix(count_matrix):
+    number_of_docs = len(count_matrix)
+    idf = [math.log((number_of_docs + 1) / (sum(1 for doc in count_matrix if doc[j]) + 1)) + 1
+           for j in range(len(count_matrix[0]))]
+    return [[round(doc[j] / sum(doc) * idf[j], 3) for j in range(len(doc))] for doc in count_matrix]
+
+
+def as_lists(matrix):
+    if isinstance(matrix, CsrMatrix):
+        matrix = matrix.toarray()
+    return [[float(value) for value in row] for row in matrix]
+
+
+@pytest.mark.parametrize("vectorizer_class", [HW_3_CountVectorizer.CountVectorizer, CountVectorizer])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_count_matrix_matches_baseline(vectorizer_class, sparse):
+    corpus = random_corpus(50)
+    count_matrix = vectorizer_class(sparse=sparse).fit_transform(corpus)
+    assert isinstance(count_matrix, CsrMatrix) == sparse
+    assert as_lists(count_matrix) == as_lists(baseline_count_matrix(corpus))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("sparse", [False, True])
+def test_tfidf_matrix_matches_baseline(engine, sparse):
+    corpus = random_corpus(50)
+    expected = baseline_tfidf_matrix(baseline_count_matrix(corpus))
+    vectorizer = TfidfVectorizer(sparse=sparse, engine=engine)
+    assert as_lists(vectorizer.fit_transform(corpus)) == expected
+    assert as_lists(TfidfVectorizer(sparse=sparse, engine=engine).fit(corpus).transform(corpus)) == expected
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_transformer_engines_match(sparse):
+    if np is None:
+        pytest.skip('нет numpy')
+    count_matrix = CountVectorizer(sparse=sparse).fit_transform(random_corpus(50))
+    python_transformer = TfidfTransformer('python')
+    numpy_transformer = TfidfTransformer('numpy')
+    assert as_lists(numpy_transformer.fit_transform(count_matrix)) \
+        == as_lists(python_transformer.fit_transform(count_matrix))
+    assert numpy_transformer.idf == python_transformer.idf
+
+
+def test_parallel_matches_serial():
+    corpus = random_corpus(2 * SHARD_SIZE + 10, seed=1)
+    serial = TfidfVectorizer(sparse=True)
+    parallel = TfidfVectorizer(sparse=True, n_jobs=2)
+    serial_matrix = serial.fit_transform(corpus)
+    parallel_matrix = parallel.fit_transform(corpus)
+    assert parallel.vocabulary == serial.vocabulary
+    assert parallel.document_frequency == serial.document_frequency
+    for name in ('indptr', 'indices', 'data'):
+        assert list(getattr(parallel_matrix, name)) == list(getattr(serial_matrix, name))
+    assert as_lists(parallel.transform(corpus[:5])) == as_lists(serial.transform(corpus[:5]))
+
+
+def test_hashing_vectorizer():
+    corpus = random_corpus(20)
+    count_matrix = HashingVectorizer(n_features=2 ** 16, alternate_sign=False).fit_transform(corpus)
+    assert count_matrix.shape == (20, 2 ** 16)
+    assert [sum(row) for row in as_lists(count_matrix)] == [len(sentence.split()) for sentence in corpus]
+    dense = HashingVectorizer(n_features=64, sparse=False).transform(corpus)
+    assert as_lists(dense) == as_lists(HashingVectorizer(n_features=64).transform(corpus))
+    assert as_lists(TfidfTransformer().fit_transform(dense)) \
+        == as_lists(TfidfTransformer().fit_transform(CsrMatrix.from_dense(dense)))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("sparse", [False, True])
+def test_update_all_matches_fit(engine, sparse):
+    corpus, batches = random_corpus(40), [random_corpus(10, seed=2) + ['new words here'],
+                                          random_corpus(5, seed=3)]
+    vectorizer = TfidfVectorizer(sparse=sparse, engine=engine)
+    vectorizer.fit_transform(corpus)
+    for batch in batches:
+        vectorizer.update(batch, reweight='all')
+    full_corpus = corpus + batches[0] + batches[1]
+    reference = TfidfVectorizer(sparse=sparse, engine=engine)
+    assert as_lists(vectorizer.tfidf_matrix) == as_lists(reference.fit_transform(full_corpus))
+    assert as_lists(vectorizer.count_matrix) == as_lists(reference.count_matrix)
+    assert vectorizer.transformer.idf == reference.transformer.idf
+
+
+def test_instrumentation():
+    corpus = random_corpus(30)
+    instrumentation = Instrumentation()
+    vectorizer = TfidfVectorizer(instrumentation=instrumentation)
+    vectorizer.fit(corpus)
+    assert instrumentation.stages['idf'].calls == 1
+    assert instrumentation.stages['tokenize'].documents == len(corpus)
+    assert instrumentation.stages['tokenize'].tokens == sum(len(sentence.split()) for sentence in corpus)
+    assert instrumentation.vocabulary_size == len(vectorizer.vocabulary)
+    instrumentation.reset()
+    tfidf_matrix = vectorizer.transform(corpus)
+    stages = {stats['name']: stats for stats in instrumentation.report()}
+    assert stages['count']['documents'] == stages['tfidf']['documents'] == len(corpus)
+    assert stages['tfidf']['nonzero'] == sum(len(row) - row.count(0) for row in tfidf_matrix)
+    assert all(stats['seconds'] >= 0 for stats in stages.values())
+
+
+@pytest.mark.parametrize("reweight", ['none', 'affected', 'all'])
+def test_partial_fit_then_update(reweight):
+    document = 'boil eggs with cheese'
+    vectorizer = TfidfVectorizer()
+    vectorizer.fit_transform(CORPUS)
+    vectorizer.partial_fit(['boil eggs'])
+    old_rows = [list(row) for row in vectorizer.tfidf_matrix]
+    new_rows = vectorizer.update([document], reweight=reweight)
+    # у старых строк появились нулевые столбцы новых слов
+    old_rows = [row + [0.0] * (len(vectorizer.vocabulary) - len(row)) for row in old_rows]
+    reference = TfidfVectorizer().fit(CORPUS + ['boil eggs', document])
+    assert vectorizer.vocabulary == reference.vocabulary
+    assert vectorizer.transformer.idf == reference.transformer.idf
+    assert vectorizer.n_documents == vectorizer.transformer.n_documents == 5
+    assert len(vectorizer.count_matrix) == len(vectorizer.tfidf_matrix) == 4
+    assert vectorizer.count_matrix is vectorizer.transformer.count_matrix
+    assert vectorizer.tfidf_matrix is vectorizer.transformer.tfidf_matrix
+    assert new_rows == reference.transform([document])
+    if reweight == 'all':
+        assert vectorizer.tfidf_matrix == reference.transform(CORPUS + [document])
+    elif reweight == 'affected':
+        # 'boil' и 'with' есть в 1-м и 3-м документах, во 2-м слов нового документа нет
+        affected = [0, 2]
+        assert [vectorizer.tfidf_matrix[i] for i in affected] \
+            == reference.transform([CORPUS[i] for i in affected])
+        assert vectorizer.tfidf_matrix[1] == old_rows[1] != reference.transform(CORPUS[1:2])[0]
+    else:
+        assert vectorizer.tfidf_matrix[:3] == old_rows
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("mmap", [False, True])
+def test_save_load(tmp_path, engine, sparse, mmap):
+    vectorizer = TfidfVectorizer(sparse=sparse, engine=engine)
+    tfidf_matrix = vectorizer.fit_transform(CORPUS)
+    path = str(tmp_path / 'vectorizer.bin')
+    vectorizer.save(path)
+    loaded = TfidfVectorizer.load(path, mmap=mmap)
+    assert loaded.sparse == sparse and loaded.transformer.engine == engine
+    assert loaded.vocabulary == vectorizer.vocabulary
+    assert list(loaded.transformer.idf) == vectorizer.transformer.idf
+    assert as_lists(loaded.count_matrix) == as_lists(vectorizer.count_matrix)
+    assert as_lists(loaded.tfidf_matrix) == as_lists(tfidf_matrix)
+    assert type(loaded.tfidf_matrix) is type(tfidf_matrix)
+    query = ['pasta with parmesan and basil']
+    assert as_lists(loaded.transform(query)) == as_lists(vectorizer.transform(query))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("params", [{'min_df': 2}, {'max_features': 3}])
+def test_update_skips_pruned_terms(tmp_path, engine, params):
+    corpus, batch = ['a b rare', 'a c', 'a b', 'b c'], ['rare a', 'c d']
+    vectorizer = TfidfVectorizer(engine=engine, **params)
+    vectorizer.fit_transform(corpus)
+    path = str(tmp_path / 'vectorizer.bin')
+    vectorizer.save(path)
+    loaded = TfidfVectorizer.load(path)
+    assert loaded.pruned_terms == vectorizer.pruned_terms == {'rare'}
+    for model in (vectorizer, loaded):
+        model.update(batch, reweight='all')
+        assert model.get_feature_names() == ['a', 'b', 'c', 'd']
+        assert model.document_frequency == [4, 3, 3, 1]
+        # tfidf по оставшимся словам совпадает с обучением на всех документах
+        reference = TfidfVectorizer(engine=engine).fit(
+            [' '.join(word for word in sentence.split() if word != 'rare') for sentence in corpus + batch])
+        assert list(model.transformer.idf) == list(reference.transformer.idf)
+        assert as_lists(model.tfidf_matrix) == as_lists(reference.transform(corpus + batch))
@@ -0,0 +1,86 @@
+import re
+from typing import Iterable
+
+
+class Analyzer:
+    """
+    В файле приведена реализация класса Analyzer, который разбивает
+    предложение на слова (токены) для CountVectorizer и TfidfVectorizer:
+    приводит к нижнему регистру, выделяет слова регулярным выражением,
+    убирает стоп-слова и составляет n-граммы слов
+    """
+
+    def __init__(self, lowercase: bool = True, token_pattern: str = None,
+                 stop_words: Iterable[str] = None, ngram_range: tuple[int, int] = (1, 1)):
+        """
+        Инициализатор класса Analyzer
+        lowercase - если True, предложение приводится к нижнему регистру
+        token_pattern - регулярное выражение для слова; по умолчанию
+                        предложение разбивается по пробелам (split())
+        stop_words - слова, которые не учитываются
+        ngram_range - кортеж (min_n, max_n): составляются n-граммы слов
+                      для всех n от min_n до max_n включительно
+        """
+        min_n, max_n = ngram_range
+        if not 1 <= min_n <= max_n:
+            raise ValueError('Некорректный ngram_range: {}'.format(ngram_range))
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self.stop_words = frozenset(stop_words or ())
+        if lowercase:
+            self.stop_words = frozenset(word.lower() for word in self.stop_words)
+        self.ngram_range = (min_n, max_n)
+        self.__token_regex = re.compile(token_pattern) if token_pattern is not None else None
+
+    def get_params(self) -> dict:
+        """
+        Функция возвращает параметры, с которыми можно создать
+        такой же Analyzer (значения сериализуются в JSON)
+        :return: словарь параметров инициализатора
+        """
+        return {
+            'lowercase': self.lowercase,
+            'token_pattern': self.token_pattern,
+            'stop_words': sorted(self.stop_words),
+            'ngram_range': list(self.ngram_range),
+        }
+
+    def __call__(self, sentence: str) -> list[str]:
+        """
+        Функция разбивает предложение на токены
+        :param sentence: строка
+        :return: список токенов (слов или n-грамм, слова в n-грамме
+                 разделены пробелом)
+        """
+        if self.lowercase:
+            sentence = sentence.lower()
+        if self.__token_regex is not None:
+            words = self.__token_regex.findall(sentence)
+        else:
+            words = sentence.split()
+        if self.stop_words:
+            words = [word for word in words if word not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return words
+        tokens = list(words) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            for i in range(len(words) - n + 1):
+                tokens.append(' '.join(words[i:i + n]))
+        return tokens
+
+
+def document_frequency_limits(min_df, max_df, n_documents: int) -> tuple[int, int]:
+    """
+    Функция переводит ограничения на документную частоту в число
+    документов. Целое значение - число документов, дробное - доля
+    :param min_df: минимальная документная частота слова
+    :param max_df: максимальная документная частота слова
+    :param n_documents: число документов в корпусе
+    :return: кортеж (минимальное, максимальное) число документов
+    """
+    min_count = min_df if isinstance(min_df, int) else min_df * n_documents
+    max_count = max_df if isinstance(max_df, int) else max_df * n_documents
+    if max_count < min_count:
+        raise ValueError('max_df соответствует меньшему числу документов, чем min_df')
+    return min_count, max_count
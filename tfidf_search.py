@@ -0,0 +1,253 @@
+import heapq
+import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from typing import Iterable
+
+from HW_4_TfIdfVectorizer import TfidfVectorizer
+from parallel_counting import effective_n_jobs
+from sparse_matrix import CsrMatrix
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+QUERY_CHUNK_SIZE = 256
+
+_worker_index = None
+
+
+class TfidfIndex:
+    """
+    В файле приведена реализация класса TfidfIndex для поиска
+    документов, наиболее похожих на запрос (по косинусной мере).
+    Строки tfidf-матрицы нормируются по L2, и для каждого слова
+    хранится список документов, в которых оно встречается (инвертированный
+    индекс). Оцениваются только документы, имеющие с запросом общие
+    слова, поэтому время запроса пропорционально длине их списков,
+    а не размеру корпуса
+    """
+
+    def __init__(self, vectorizer: TfidfVectorizer, engine: str = 'python', n_jobs: int = 1):
+        """
+        Инициализатор класса TfidfIndex
+        vectorizer - обученный TfidfVectorizer: его analyzer, словарь
+                     и idf-значения копируются и используются для
+                     векторизации запросов, поэтому дообучение vectorizer
+                     не меняет индекс
+        engine - способ вычислений: 'python' (по умолчанию) или 'numpy'
+                 (векторизованное накопление оценок, требуется numpy)
+        n_jobs - число процессов для пакетных запросов (-1 - по числу ядер)
+        n_documents - число проиндексированных документов
+        column_ptr, row_indices, weights - индекс в формате CSC:
+                 документы, содержащие слово из столбца j, и их
+                 нормированные веса занимают элементы
+                 column_ptr[j]:column_ptr[j + 1]
+        """
+        if engine not in ('python', 'numpy'):
+            raise ValueError("engine должен быть 'python' или 'numpy', получено {!r}".format(engine))
+        if engine == 'numpy' and np is None:
+            raise ImportError("Для engine='numpy' требуется пакет numpy")
+        self.engine = engine
+        self.n_jobs = n_jobs
+        self.analyzer = vectorizer.analyzer
+        self.vocabulary = dict(vectorizer.vocabulary)
+        self.idf = list(vectorizer.transformer.idf)
+        self.n_documents = 0
+        self.column_ptr = array('q', [0] * (len(self.vocabulary) + 1))
+        self.row_indices = array('q')
+        self.weights = array('d')
+        self.__numpy_index = None
+
+    def fit(self, tfidf_matrix) -> 'TfidfIndex':
+        """
+        Функция строит инвертированный индекс по tfidf-матрице за два
+        прохода по ее ненулевым элементам
+        :param tfidf_matrix: tfidf-матрица (CsrMatrix, список списков
+                             или numpy.ndarray), столбцы которой
+                             соответствуют словарю vectorizer
+        :return: возвращается сам объект TfidfIndex
+        """
+        if not isinstance(tfidf_matrix, CsrMatrix):
+            tfidf_matrix = CsrMatrix.from_dense([list(row) for row in tfidf_matrix], 'd')
+        n_rows, n_columns = tfidf_matrix.shape
+        if n_columns != len(self.vocabulary):
+            raise ValueError('Число столбцов матрицы ({}) не совпадает с размером '
+                             'словаря ({})'.format(n_columns, len(self.vocabulary)))
+        if self.engine == 'numpy':
+            self.__numpy_fit(tfidf_matrix)
+        else:
+            self.__python_fit(tfidf_matrix)
+        self.n_documents = n_rows
+        self.__numpy_index = None
+        return self
+
+    def most_similar(self, query: str, k: int = 10) -> list[tuple[int, float]]:
+        """
+        Функция находит k документов, наиболее похожих на запрос
+        :param query: строка запроса
+        :param k: число документов
+        :return: список кортежей (номер документа, косинусная мера)
+                 по убыванию меры; документы без общих с запросом слов
+                 не возвращаются
+        """
+        vector = self.query_vector(query)
+        if k <= 0 or not vector:
+            return []
+        if self.engine == 'numpy':
+            return self.__numpy_search(vector, k)
+        return self.__python_search(vector, k)
+
+    def most_similar_many(self, queries: Iterable[str], k: int = 10) -> list[list[tuple[int, float]]]:
+        """
+        Функция выполняет пакет запросов; при n_jobs > 1 запросы
+        делятся на части и обрабатываются в пуле процессов, каждый
+        из которых получает копию индекса один раз
+        :param queries: итерируемый объект со строками запросов
+        :param k: число документов для каждого запроса
+        :return: список результатов most_similar в порядке запросов
+        """
+        n_jobs = effective_n_jobs(self.n_jobs)
+        if n_jobs == 1:
+            return [self.most_similar(query, k) for query in queries]
+        queries = iter(queries)
+        chunks = iter(lambda: list(islice(queries, QUERY_CHUNK_SIZE)), [])
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            return [result
+                    for chunk_results in executor.map(_search_chunk, chunks, repeat(k))
+                    for result in chunk_results]
+
+    def query_vector(self, query: str) -> list[tuple[int, float]]:
+        """
+        Функция переводит запрос в нормированный tfidf-вектор так же,
+        как TfidfVectorizer.transform, но без плотной строки длины
+        словаря. Слова, которых нет в словаре, пропускаются
+        :param query: строка запроса
+        :return: список кортежей (номер столбца, вес)
+        """
+        counts = {}
+        for word in self.analyzer(query):
+            column = self.vocabulary.get(word)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        number_of_words = sum(counts.values())
+        vector = [(column, round(count / number_of_words * self.idf[column], 3))
+                  for column, count in counts.items()]
+        norm = math.sqrt(sum(weight * weight for _, weight in vector))
+        if not norm:
+            return []
+        return [(column, weight / norm) for column, weight in vector if weight]
+
+    def __python_fit(self, tfidf_matrix: CsrMatrix):
+        """
+        Функция строит индекс сортировкой подсчетом: сначала считается
+        длина списка каждого слова, затем списки заполняются по строкам,
+        поэтому документы в списке идут по возрастанию номера
+        :param tfidf_matrix: tfidf-матрица CsrMatrix
+        :return: функция ничего не возвращает
+        """
+        n_rows, n_columns = tfidf_matrix.shape
+        indptr = list(tfidf_matrix.indptr)
+        indices = list(tfidf_matrix.indices)
+        data = list(tfidf_matrix.data)
+        column_ptr = [0] * (n_columns + 1)
+        for column, value in zip(indices, data):
+            if value:
+                column_ptr[column + 1] += 1
+        for column in range(n_columns):
+            column_ptr[column + 1] += column_ptr[column]
+        positions = column_ptr[:-1]
+        row_indices = [0] * column_ptr[-1]
+        weights = [0.0] * column_ptr[-1]
+        for row in range(n_rows):
+            start, end = indptr[row], indptr[row + 1]
+            norm = math.sqrt(sum(value * value for value in data[start:end]))
+            for j in range(start, end):
+                if data[j]:
+                    column = indices[j]
+                    position = positions[column]
+                    row_indices[position] = row
+                    weights[position] = data[j] / norm
+                    positions[column] = position + 1
+        self.column_ptr = array('q', column_ptr)
+        self.row_indices = array('q', row_indices)
+        self.weights = array('d', weights)
+
+    def __numpy_fit(self, tfidf_matrix: CsrMatrix):
+        """
+        Функция строит индекс векторизованно: нормы строк находятся
+        суммированием по строкам, а элементы упорядочиваются по столбцам
+        устойчивой сортировкой, поэтому индекс совпадает с __python_fit
+        :param tfidf_matrix: tfidf-матрица CsrMatrix
+        :return: функция ничего не возвращает
+        """
+        n_rows, n_columns = tfidf_matrix.shape
+        indptr = np.asarray(tfidf_matrix.indptr, dtype=np.int64)
+        indices = np.asarray(tfidf_matrix.indices, dtype=np.int64)
+        data = np.asarray(tfidf_matrix.data, dtype=np.float64)
+        rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n_rows))
+        nonzero = data != 0
+        rows, indices, data = rows[nonzero], indices[nonzero], data[nonzero]
+        order = np.argsort(indices, kind='stable')
+        column_ptr = np.zeros(n_columns + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=n_columns), out=column_ptr[1:])
+        self.column_ptr = array('q', column_ptr.tobytes())
+        self.row_indices = array('q', rows[order].tobytes())
+        self.weights = array('d', (data / norms[rows])[order].tobytes())
+
+    def __python_search(self, vector: list[tuple[int, float]], k: int) -> list[tuple[int, float]]:
+        """
+        Функция накапливает оценки документов в словаре, проходя по
+        спискам документов слов запроса
+        :param vector: нормированный вектор запроса
+        :param k: число документов
+        :return: k лучших документов
+        """
+        scores = {}
+        column_ptr, row_indices, weights = self.column_ptr, self.row_indices, self.weights
+        for column, query_weight in vector:
+            for j in range(column_ptr[column], column_ptr[column + 1]):
+                row = row_indices[j]
+                scores[row] = scores.get(row, 0.0) + query_weight * weights[j]
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(row, score) for row, score in best if score > 0]
+
+    def __numpy_search(self, vector: list[tuple[int, float]], k: int) -> list[tuple[int, float]]:
+        """
+        Функция накапливает оценки в массиве длины n_documents, добавляя
+        список документов каждого слова запроса одной операцией,
+        и выбирает k лучших с помощью argpartition
+        :param vector: нормированный вектор запроса
+        :param k: число документов
+        :return: k лучших документов
+        """
+        if self.__numpy_index is None:
+            self.__numpy_index = (np.asarray(self.column_ptr), np.asarray(self.row_indices),
+                                  np.asarray(self.weights))
+        column_ptr, row_indices, weights = self.__numpy_index
+        scores = np.zeros(self.n_documents)
+        for column, query_weight in vector:
+            start, end = column_ptr[column], column_ptr[column + 1]
+            # в списке одного слова каждый документ встречается один раз
+            scores[row_indices[start:end]] += query_weight * weights[start:end]
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            threshold = scores[candidates].min()
+            # документы с той же оценкой, что и k-й, упорядочиваются по номеру
+            candidates = np.flatnonzero(scores >= threshold)
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        return [(int(row), float(scores[row])) for row in candidates[order]]
+
+
+def _init_worker(index: TfidfIndex):
+    global _worker_index
+    _worker_index = index
+
+
+def _search_chunk(queries: list[str], k: int) -> list[list[tuple[int, float]]]:
+    return [_worker_index.most_similar(query, k) for query in queries]
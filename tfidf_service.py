@@ -0,0 +1,232 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Iterable
+
+from HW_4_TfIdfVectorizer import TfidfVectorizer
+from sparse_matrix import CsrMatrix
+
+_STOP = object()
+
+
+class TfidfBatchService:
+    """
+    В файле приведена реализация класса TfidfBatchService, который
+    собирает документы из одиночных асинхронных запросов в пакеты
+    и векторизует каждый пакет одним вызовом transform обученного
+    TfidfVectorizer. Пакет отправляется, когда в нем набралось
+    max_batch_size документов или когда с прихода первого из них
+    прошло max_delay секунд, поэтому max_delay ограничивает добавку
+    к задержке одного запроса
+    """
+
+    def __init__(self, vectorizer: TfidfVectorizer, max_batch_size: int = 64,
+                 max_delay: float = 0.005, max_queue_size: int = 0,
+                 executor: Executor = None):
+        """
+        Инициализатор класса TfidfBatchService
+        vectorizer - обученный TfidfVectorizer
+        max_batch_size - наибольшее число документов в пакете
+        max_delay - наибольшее время ожидания пакета в секундах
+        max_queue_size - наибольшее число ожидающих документов
+                         (0 - без ограничения); при заполненной очереди
+                         transform ждет освобождения места
+        executor - пул, в котором выполняется transform (None - в цикле
+                   событий: меньше накладных расходов, но цикл событий
+                   блокируется на время векторизации пакета)
+        n_batches, n_documents - число обработанных пакетов и документов
+        """
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size должен быть положительным, получено {!r}'
+                             .format(max_batch_size))
+        if max_delay < 0:
+            raise ValueError('max_delay не может быть отрицательным, получено {!r}'
+                             .format(max_delay))
+        self.vectorizer = vectorizer
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        self.n_batches = 0
+        self.n_documents = 0
+        self.__queue = None
+        self.__worker = None
+
+    async def __aenter__(self) -> 'TfidfBatchService':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self):
+        """
+        Функция запускает задачу, собирающую и обрабатывающую пакеты
+        :return: функция ничего не возвращает
+        """
+        if self.__worker is not None:
+            raise RuntimeError('Сервис уже запущен')
+        self.__queue = asyncio.Queue(self.max_queue_size)
+        self.__worker = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        """
+        Функция останавливает сервис; документы, поставленные в очередь
+        до вызова stop, обрабатываются
+        :return: функция ничего не возвращает
+        """
+        worker, self.__worker = self.__worker, None
+        if worker is None:
+            return
+        await self.__queue.put(_STOP)
+        await worker
+        # запросы, ожидавшие места в очереди во время остановки
+        while not self.__queue.empty():
+            item = self.__queue.get_nowait()
+            if item is not _STOP and not item[1].done():
+                item[1].set_exception(RuntimeError('Сервис остановлен'))
+
+    async def transform(self, document: str):
+        """
+        Функция векторизует один документ в составе ближайшего пакета
+        :param document: строка документа
+        :return: строка tfidf-матрицы: список значений или, если
+                 TfidfVectorizer(sparse=True), кортеж (номера столбцов, значения)
+        """
+        if self.__worker is None:
+            raise RuntimeError('Сервис не запущен (вызовите start или используйте async with)')
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((document, future))
+        return await future
+
+    async def transform_many(self, documents: Iterable[str]) -> list:
+        """
+        Функция векторизует документы как независимые запросы
+        :param documents: итерируемый объект со строками документов
+        :return: список строк tfidf-матрицы в порядке документов
+        """
+        return list(await asyncio.gather(*map(self.transform, documents)))
+
+    async def __run(self):
+        """
+        Функция собирает пакеты из очереди и обрабатывает их до
+        получения признака остановки
+        :return: функция ничего не возвращает
+        """
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.__queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                if self.__queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.__queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self.__queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self.__process(batch)
+
+    async def __process(self, batch: list[tuple]):
+        """
+        Функция векторизует пакет и передает строки результата
+        ожидающим запросам; ошибка векторизации передается всем
+        запросам пакета
+        :param batch: список кортежей (документ, future)
+        :return: функция ничего не возвращает
+        """
+        batch = [(document, future) for document, future in batch if not future.done()]
+        if not batch:
+            return
+        documents = [document for document, _ in batch]
+        try:
+            if self.executor is None:
+                matrix = self.vectorizer.transform(documents)
+            else:
+                matrix = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.vectorizer.transform, documents)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.n_batches += 1
+        self.n_documents += len(batch)
+        for (_, future), row in zip(batch, _rows(matrix)):
+            if not future.done():
+                future.set_result(row)
+
+
+class LocalClient:
+    """
+    В файле приведена реализация класса LocalClient, который заменяет
+    HTTP-клиент при проверке сервиса в одном процессе: запросы и ответы
+    имеют вид JSON-объектов, но передаются вызовом корутины
+    """
+
+    def __init__(self, service: TfidfBatchService):
+        """
+        Инициализатор класса LocalClient
+        service - запущенный TfidfBatchService
+        """
+        self.service = service
+
+    async def post(self, payload: dict) -> dict:
+        """
+        Функция обрабатывает запрос {'document': строка}
+        :param payload: тело запроса
+        :return: {'vector': строка tfidf-матрицы} или
+                 {'error': сообщение} при ошибке
+        """
+        document = payload.get('document')
+        if not isinstance(document, str):
+            return {'error': "Ожидается поле 'document' со строкой"}
+        try:
+            row = await self.service.transform(document)
+        except Exception as error:
+            return {'error': str(error)}
+        if isinstance(row, tuple):
+            indices, data = row
+            row = {'indices': [int(i) for i in indices], 'data': [float(v) for v in data]}
+        else:
+            row = [float(value) for value in row]
+        return {'vector': row}
+
+
+def _rows(matrix) -> list:
+    """
+    Функция разбивает результат transform на строки
+    :param matrix: CsrMatrix, список списков или numpy.ndarray
+    :return: список строк
+    """
+    if isinstance(matrix, CsrMatrix):
+        return [matrix.row(i) for i in range(len(matrix))]
+    return list(matrix)
+
+
+async def _demo():
+    corpus = [
+        'Crock Pot Pasta Never boil pasta again',
+        'Pasta Pomodoro Fresh ingredients Parmesan to taste'
+    ]
+    vectorizer = TfidfVectorizer().fit(corpus)
+    async with TfidfBatchService(vectorizer, max_batch_size=8, max_delay=0.01) as service:
+        client = LocalClient(service)
+        responses = await asyncio.gather(*(client.post({'document': document})
+                                           for document in corpus + ['Pasta with fresh Parmesan']))
+    print(*responses, sep='\n')
+    print('batches: {}, documents: {}'.format(service.n_batches, service.n_documents))
+
+
+if __name__ == '__main__':
+    asyncio.run(_demo())